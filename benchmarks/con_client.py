@@ -0,0 +1,108 @@
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from moduals.con import AsyncDBClient
+from moduals.con_server import AsyncDBServer
+
+KEY = "benchmark-key"
+
+VARIANTS = {
+    "pool(1)": {"max_size": 1},
+    "pool(10)": {"max_size": 10},
+    "multiplex": {"multiplex": True},
+    "batch": {"max_size": 1, "auto_batch": True},
+    "zlib": {"multiplex": True, "compression": True},
+}
+
+
+def percentile(samples: List[float], q: float) -> float:
+    # Nearest-rank auf den sortierten Einzelmessungen
+    index = min(len(samples) - 1, max(0, int(round(q * len(samples))) - 1))
+    return samples[index]
+
+
+async def run(client: AsyncDBClient, requests: int, concurrency: int, payload: str) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await client.call("bench", "work", [i, payload])
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    # Aufwärmen, damit Verbindungsaufbau und Handshake nicht in die Messung fallen
+    await asyncio.gather(*(one(-1) for _ in range(min(concurrency, requests))))
+    latencies.clear()
+    errors = 0
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.50) * 1000 if latencies else 0.0,
+        "p95": percentile(latencies, 0.95) * 1000 if latencies else 0.0,
+        "p99": percentile(latencies, 0.99) * 1000 if latencies else 0.0,
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Latenz und Durchsatz von AsyncDBClient.call()")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--payload", type=int, nargs="+", default=[16, 4096, 65536], help="Nutzlast pro Aufruf in Bytes")
+    parser.add_argument("--latency", type=float, default=5.0, help="Simulierte Server-Latenz in ms")
+    parser.add_argument("--variants", nargs="+", default=list(VARIANTS), choices=list(VARIANTS))
+    parser.add_argument("--host", help="Vorhandenen Server messen statt den lokalen Ersatzserver zu starten")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--key", default=KEY)
+    args = parser.parse_args()
+
+    server = None
+    host, port = args.host, args.port
+    if host is None:
+        server = AsyncDBServer("127.0.0.1", 0, args.key)
+
+        async def work(data):
+            await asyncio.sleep(args.latency / 1000)
+            return data
+
+        server.register("bench", "work", work)
+        await server.start()
+        host, port = "127.0.0.1", server.port
+
+    print(f"{'variante':<10} {'payload':>8} {'conc':>5} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'fehler':>6}")
+    try:
+        for size in args.payload:
+            payload = "x" * size
+            for concurrency in args.concurrency:
+                for label in args.variants:
+                    client = AsyncDBClient(host, port, args.key, **VARIANTS[label])
+                    result = await run(client, args.requests, concurrency, payload)
+                    await client.close()
+                    print(
+                        f"{label:<10} {size:>8} {concurrency:>5} {result['throughput']:>10.1f} "
+                        f"{result['p50']:>8.2f} {result['p95']:>8.2f} {result['p99']:>8.2f} {result['errors']:>6}"
+                    )
+    finally:
+        if server is not None:
+            await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
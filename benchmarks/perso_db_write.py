@@ -0,0 +1,68 @@
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from moduals.perso_crud import Person, PersonenDB
+
+
+def make_person(i: int) -> Person:
+    return Person(
+        vollstaendiger_name=f"Max Mustermann {i}",
+        geburtsdatum="01.01.2000",
+        geburtsort_nationalitaet="Hamburg / Deutsch",
+        groesse="180cm",
+        geschlecht="Männlich",
+        status="angenommen",
+    )
+
+
+def prefill(base_path: Path, users: int):
+    data = {str(i): [make_person(i).to_dict()] for i in range(users)}
+    with open(base_path / "personen.json", "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def measure(db: PersonenDB, writes: int, offset: int) -> list:
+    timings = []
+    for i in range(writes):
+        start = time.perf_counter()
+        db.add_perso(str(offset + i), make_person(offset + i))
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, users: int, timings: list):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{label:<10} users={users:<7} writes={len(timings):<5} "
+          f"mean={statistics.mean(timings):9.3f}ms p50={statistics.median(timings):9.3f}ms p95={p95:9.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schreiblatenz von PersonenDB: save() vs. Journal vs. SQLite")
+    parser.add_argument("--users", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--writes", type=int, default=20)
+    args = parser.parse_args()
+
+    variants = [
+        ("save()", {}),
+        ("journal", {"journal": True, "compact_threshold": 1 << 40}),
+        ("sqlite", {"backend": "sqlite"}),
+    ]
+    for users in args.users:
+        for label, options in variants:
+            with tempfile.TemporaryDirectory() as tmp:
+                prefill(Path(tmp), users)
+                db = PersonenDB(Path(tmp), **options)
+                report(label, users, measure(db, args.writes, users))
+                db.close()
+
+
+if __name__ == "__main__":
+    main()
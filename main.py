@@ -1,5 +1,7 @@
 import asyncio
 import json
+import logging
+import math
 import sys
 import time
 import discord
@@ -8,61 +10,94 @@ from discord.ext import commands
 from discord.ui import Modal, TextInput, Button, View, Select
 import os
 from typing import List
-from moduals.perso_crud import Person, PersonenDB
+from moduals.perso_crud import Person, PersonenDB, AsyncPersonenDB
 from pathlib import Path
 from enum import Enum
 from moduals.ini_crud import INIManager
 from moduals.logger_crud import LoggingManager
-import requests
+from moduals.lock_crud import LockManager
+from moduals.webhook_crud import WebhookLogShipper
+from moduals.http_crud import HTTPClient
+from moduals.cache_crud import DMChannelCache
+from moduals.backup_crud import BackupManager
+from moduals.config_crud import BotConfig
+from moduals.metrics_crud import MetricsServer, http_trace_config, metrics
+from moduals.loop_monitor import LoopMonitor
+from moduals.channel_export import (
+    ChannelCheckpoints, NDJSONWriter, ProgressReporter, iter_embed_records, mirror_channel, sync_channel
+)
 import aiohttp
-import io
+import tempfile
 
 variables = INIManager("app_data/ini/variables.ini")
 
 
-class Vars(str, Enum):
-    GUILD = variables.get("DISCORD", "GUILD")
-    DATABASE = variables.get("DISCORD", "DATABASE")
-    CREATION = variables.get("DISCORD", "CREATION")
-    SHOW = variables.get("DISCORD", "SHOW")
-    PROF = variables.get("DISCORD", "PROF")
-    GENERAL = variables.get("COMMANDS", "GENERAL")
-    DELLPERSO = variables.get("COMMANDS", "DELLPERSO")
-    STOP = variables.get("COMMANDS", "STOP")
-    USERDATA = variables.get("COMMANDS", "USERDATA")
-    DynamicSelectPlaceholder = variables.get("VARS", "DynamicSelectPlaceholder")
-    BackUps = variables.get("VARS", "BackUps")
-    BackUpsFile = variables.get("VARS", "BackUpsFile")
-    BackUpsTime = variables.get("VARS", "BackUpsTime")
-    CreatePerso = variables.get("CommandNames", "CreatePerso")
-    DeletePerso = variables.get("CommandNames", "DeletePerso")
-    ShowPerso = variables.get("CommandNames", "ShowPerso")
-    PersoDatabase = variables.get("FILES", "PersoDatabase")
-    PersoPng = variables.get("FILES", "PersoPng")
-    DebugLog = variables.get("FILES", "DebugLog")
+config = BotConfig(variables)
 
 
-LOCKS_FILE = Path("locks.json")
+lock_manager = LockManager(Path("locks.json"))
+channel_checkpoints = ChannelCheckpoints(Path("data/channel_archive/checkpoints.json"))
 
 
-def load_locks():
-    if LOCKS_FILE.exists():
-        with LOCKS_FILE.open("r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
-
-def save_locks(locks):
-    with LOCKS_FILE.open("w", encoding="utf-8") as f:
-        json.dump(locks, f, indent=2)
+def log_sample_rates() -> dict:
+    # Häufige DEBUG-Zeilen aus UI-Komponenten und Prefix-Commands nur stichprobenartig schreiben
+    return {
+        "SystemLogger.ui": config.log_debug_sample_rate,
+        "SystemLogger.commands": config.log_debug_sample_rate,
+    }
 
 
-logger = LoggingManager(Vars.DebugLog.value).get_logger()
+logging_manager = LoggingManager(
+    config.debug_log,
+    max_bytes=config.log_max_bytes,
+    backup_count=config.log_backup_count,
+    rotate_interval=config.log_rotate_interval,
+    sample_rates=log_sample_rates(),
+)
+logger = logging_manager.get_logger()
+ui_logger = logging.getLogger("SystemLogger.ui")
+command_logger = logging.getLogger("SystemLogger.commands")
 
 try:
-    perso_db = PersonenDB(Path("."))
+    perso_backend = config.perso_backend
+    perso_options = {}
+    if perso_backend == "json":
+        perso_options = dict(
+            write_behind=config.perso_write_behind,
+            flush_interval=config.perso_flush_interval,
+            journal=config.perso_journal,
+            compact_threshold=config.perso_compact_size,
+        )
+    load_start = time.perf_counter()
+    perso_db = AsyncPersonenDB(PersonenDB(Path("."), backend=perso_backend, **perso_options))
+    logger.info("PersonenDB (%s) in %.1f ms geladen", perso_backend, (time.perf_counter() - load_start) * 1000)
 except Exception as e:
-    logger.error(e)
+    # Ohne Ausweis-Datenbank fehlen Befehlen und Backups die Grundlage: Start abbrechen
+    logger.critical("PersonenDB konnte nicht geladen werden: %s", e)
+    raise
+
+metrics_server = MetricsServer(metrics, port=config.metrics_port)
+loop_monitor = LoopMonitor(config.loop_monitor_interval, config.loop_stall_threshold)
+
+backup_manager = BackupManager(
+    Path("app_data/backups"),
+    {"personen": perso_db.db.snapshot, "locks": lock_manager.snapshot},
+    keep=config.backups_keep,
+    interval=config.backups_interval,
+)
+
+
+def apply_config():
+    # Werte, die im laufenden Betrieb übernommen werden können; der Rest steht in RESTART_REQUIRED
+    logging_manager.set_sample_rates(log_sample_rates())
+    backup_manager.keep = max(1, config.backups_keep)
+    # Ein neues Intervall gilt ab dem nächsten Backup
+    backup_manager.interval = config.backups_interval
+    if config.backups_enabled != backup_manager.running:
+        asyncio.create_task(backup_manager.start() if config.backups_enabled else backup_manager.stop())
+
+
+config.on_reload(apply_config)
 
 
 class Status(str, Enum):
@@ -72,6 +107,10 @@ class Status(str, Enum):
     abgelehnt = "abgelehnt"
 
 
+class DMsClosed(Exception):
+    pass
+
+
 async def send_embed(
         interaction: discord.Interaction = None,
         channel_id: int = None,
@@ -128,25 +167,31 @@ async def send_embed(
 
         if user_id:
             try:
-                user = await bot.fetch_user(user_id)
-                dm_channel = user.dm_channel or await user.create_dm()
+                # Nutzer mit geschlossenen DMs werden eine Zeit lang ohne API-Aufruf übersprungen
+                if dm_cache.is_forbidden(user_id):
+                    raise DMsClosed()
+                dm_channel = await dm_cache.get_dm_channel(user_id)
 
                 if view:
                     await dm_channel.send(embed=embed, view=view)
                 else:
                     await dm_channel.send(embed=embed)
-                logger.info(f"Embed erfolgreich an User {user_id} gesendet")
+                logger.info("Embed erfolgreich an User %s gesendet", user_id)
                 return
-            except discord.Forbidden:
+            except (discord.Forbidden, DMsClosed) as e:
+                # Nur eine echte Ablehnung setzt die Sperrfrist, sonst würde jedes Überspringen sie verlängern
+                if isinstance(e, discord.Forbidden):
+                    dm_cache.mark_forbidden(user_id)
                 if interaction:
                     await interaction.followup.send(
                         "Konnte keine DM senden (Nutzer hat DMs deaktiviert)",
                         ephemeral=True
                     )
-                logger.warning(f"Konnte DM an User {user_id} nicht senden (DMs deaktiviert)")
+                logger.warning("Konnte DM an User %s nicht senden (DMs deaktiviert)", user_id)
                 return
             except Exception as e:
-                logger.error(f"Fehler beim DM-Versand an User {user_id}: {str(e)}", exc_info=True)
+                dm_cache.forget(user_id)
+                logger.error("Fehler beim DM-Versand an User %s: %s", user_id, e, exc_info=True)
                 if interaction:
                     await interaction.followup.send(
                         "Es gab einen Fehler beim Senden der DM.",
@@ -164,9 +209,9 @@ async def send_embed(
                     await channel.send(embed=embed, view=view)
                 else:
                     await channel.send(embed=embed)
-                logger.info(f"Embed erfolgreich in Channel {channel_id} gesendet")
+                logger.info("Embed erfolgreich in Channel %s gesendet", channel_id)
             except Exception as e:
-                logger.error(f"Fehler beim Senden in Channel {channel_id}: {str(e)}", exc_info=True)
+                logger.error("Fehler beim Senden in Channel %s: %s", channel_id, e, exc_info=True)
                 if interaction:
                     await interaction.followup.send(
                         f"Es gab einen Fehler beim Senden in Channel {channel_id}.",
@@ -189,7 +234,7 @@ async def send_embed(
                     await interaction.response.send_message(**kwargs)
                 logger.info("Embed erfolgreich als Interaktionsantwort gesendet")
             except Exception as e:
-                logger.error(f"Fehler beim Senden der Interaktionsantwort: {str(e)}", exc_info=True)
+                logger.error("Fehler beim Senden der Interaktionsantwort: %s", e, exc_info=True)
                 try:
                     await interaction.followup.send(
                         "Es gab einen Fehler beim Senden der Antwort.",
@@ -199,7 +244,7 @@ async def send_embed(
                     pass
 
     except Exception as e:
-        logger.critical(f"Kritischer Fehler in send_embed: {str(e)}", exc_info=True)
+        logger.critical("Kritischer Fehler in send_embed: %s", e, exc_info=True)
         if interaction:
             try:
                 await interaction.followup.send(
@@ -212,7 +257,7 @@ async def send_embed(
 
 class DynamicModal(discord.ui.Modal):
     def __init__(self, fields: List[str], *args, **kwargs):
-        self.logger = logger
+        self.logger = ui_logger
         super().__init__(*args, **kwargs)
         self.fields = fields
         self.data = {}
@@ -229,9 +274,9 @@ class DynamicModal(discord.ui.Modal):
                 )
                 self.user_inputs.append(text_input)
                 self.add_item(text_input)
-            self.logger.debug(f"DynamicModal mit Feldern {fields} initialisiert")
+            self.logger.debug("DynamicModal mit Feldern %s initialisiert", fields)
         except Exception as e:
-            self.logger.error(f"Fehler beim Initialisieren des DynamicModal: {str(e)}", exc_info=True)
+            self.logger.error("Fehler beim Initialisieren des DynamicModal: %s", e, exc_info=True)
             raise
 
     async def on_submit(self, interaction: discord.Interaction):
@@ -240,9 +285,10 @@ class DynamicModal(discord.ui.Modal):
             await interaction.response.defer()
             self.interaction = interaction
             self.discord_userid = interaction.user.id
-            self.logger.info(f"Modal submitted von User {self.discord_userid} mit Daten: {self.data}")
+            # Nur die Feldnamen loggen, die Eingaben enthalten personenbezogene Daten
+            self.logger.info("Modal submitted von User %s (Felder: %s)", self.discord_userid, ", ".join(self.data))
         except Exception as e:
-            self.logger.error(f"Fehler beim Verarbeiten des Modal-Submits: {str(e)}", exc_info=True)
+            self.logger.error("Fehler beim Verarbeiten des Modal-Submits: %s", e, exc_info=True)
             try:
                 await interaction.response.send_message(
                     "Es gab einen Fehler beim Verarbeiten deiner Eingabe.",
@@ -253,7 +299,7 @@ class DynamicModal(discord.ui.Modal):
             raise
 
     async def on_error(self, interaction: discord.Interaction, error: Exception):
-        self.logger.error(f"Modal-Fehler: {str(error)}", exc_info=True)
+        self.logger.error("Modal-Fehler: %s", error, exc_info=True)
         try:
             await interaction.response.send_message(
                 "Es gab einen unerwarteten Fehler. Bitte versuche es später erneut.",
@@ -265,28 +311,29 @@ class DynamicModal(discord.ui.Modal):
 
 class DynamicSelect(discord.ui.Select):
     def __init__(self, options: List[discord.SelectOption]):
-        self.logger = logger
+        self.logger = ui_logger
         try:
             super().__init__(
-                placeholder="Wähle eine Option...",
+                placeholder=config.select_placeholder,
                 min_values=1,
                 max_values=1,
                 options=options
             )
-            self.logger.debug(f"DynamicSelect mit {len(options)} Optionen initialisiert")
+            self.logger.debug("DynamicSelect mit %s Optionen initialisiert", len(options))
         except Exception as e:
-            self.logger.error(f"Fehler beim Initialisieren des DynamicSelect: {str(e)}", exc_info=True)
+            self.logger.error("Fehler beim Initialisieren des DynamicSelect: %s", e, exc_info=True)
             raise
 
+    @metrics.timed("view_callback", callback="select")
     async def callback(self, interaction: discord.Interaction):
         try:
             self.view.selected_value = self.values[0]
             await interaction.response.defer()
             await interaction.delete_original_response()
-            self.logger.info(f"Select-Option '{self.view.selected_value}' von User {interaction.user.id} gewählt")
+            self.logger.info("Select-Option '%s' von User %s gewählt", self.view.selected_value, interaction.user.id)
             self.view.stop()
         except Exception as e:
-            self.logger.error(f"Fehler im Select-Callback: {str(e)}", exc_info=True)
+            self.logger.error("Fehler im Select-Callback: %s", e, exc_info=True)
             try:
                 await interaction.response.send_message(
                     "Es gab einen Fehler bei der Auswahl. Bitte versuche es erneut.",
@@ -299,19 +346,19 @@ class DynamicSelect(discord.ui.Select):
 
 class DropdownView(discord.ui.View):
     def __init__(self, options: List[discord.SelectOption]):
-        self.logger = logger
+        self.logger = ui_logger
         super().__init__()
         self.selected_value = None
         try:
             self.add_item(DynamicSelect(options))
-            self.logger.debug(f"DropdownView mit {len(options)} Optionen initialisiert")
+            self.logger.debug("DropdownView mit %s Optionen initialisiert", len(options))
         except Exception as e:
-            self.logger.error(f"Fehler beim Initialisieren des DropdownView: {str(e)}", exc_info=True)
+            self.logger.error("Fehler beim Initialisieren des DropdownView: %s", e, exc_info=True)
             raise
 
     async def on_error(self, interaction: discord.Interaction, error: Exception, item: discord.ui.Item):
         self.logger.error(
-            f"View-Fehler bei Item {item}: {str(error)}",
+            "View-Fehler bei Item %s: %s", item, error,
             exc_info=True
         )
         try:
@@ -326,11 +373,14 @@ class DropdownView(discord.ui.View):
 WEBHOOK_URL = "https://discord.com/api/webhooks/1400072969354612831/u1IAWbZ8pfrlGfzmRTOR7tzaLXQ6dfNLaT__pLiYAo1Wb-tOAYYjN0QuEe_Z7oyveuTx"
 
 
+webhook_logger = WebhookLogShipper(WEBHOOK_URL, Path("app_data/log/webhook_buffer.ndjson"))
+
+
 def send_webhook_log(content: str):
     try:
-        requests.post(WEBHOOK_URL, json={"content": content})
+        webhook_logger.submit(content)
     except Exception as e:
-        logger.error(f"Fehler beim Senden des Webhook-Logs: {str(e)}")
+        logger.error("Fehler beim Senden des Webhook-Logs: %s", e)
 
 
 class ApprovalButtons(discord.ui.View):
@@ -341,10 +391,10 @@ class ApprovalButtons(discord.ui.View):
         self.logger = logger
         self.id_a = a
         self.is_fake = is_fake
-        self.logger.info(f"ApprovalButtons initialisiert für User {user_id} mit UUID {uuid} (Gefälscht: {is_fake})")
+        self.logger.info("ApprovalButtons initialisiert für User %s mit UUID %s (Gefälscht: %s)", user_id, uuid, is_fake)
 
     async def handle_error(self, interaction: discord.Interaction, error: Exception, action: str):
-        self.logger.error(f"Fehler bei {action}: {str(error)}", exc_info=True)
+        self.logger.error("Fehler bei %s: %s", action, error, exc_info=True)
         try:
             await interaction.followup.send(
                 f"Ein Fehler ist während der {action} aufgetreten. Bitte versuche es später erneut.",
@@ -354,6 +404,7 @@ class ApprovalButtons(discord.ui.View):
             pass
 
     @discord.ui.button(label="Annehmen", style=discord.ButtonStyle.success, emoji="✅", custom_id="approve_btn")
+    @metrics.timed("view_callback", callback="approve")
     async def approve(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
             await interaction.response.defer(ephemeral=True)
@@ -362,7 +413,7 @@ class ApprovalButtons(discord.ui.View):
                 if hasattr(self, 'id_a') and self.id_a:
                     message = await interaction.channel.fetch_message(self.id_a)
                     await message.delete()
-                    self.logger.debug(f"Antragsnachricht {self.id_a} gelöscht")
+                    self.logger.debug("Antragsnachricht %s gelöscht", self.id_a)
 
                 if interaction.message:
                     await interaction.message.delete()
@@ -373,18 +424,18 @@ class ApprovalButtons(discord.ui.View):
             except discord.Forbidden:
                 self.logger.error("Keine Berechtigung zum Löschen der Nachrichten")
             except Exception as e:
-                self.logger.error(f"Fehler beim Löschen: {str(e)}")
+                self.logger.error("Fehler beim Löschen: %s", e)
 
             try:
                 antrag = perso_db.get_perso_by_uuid(uuid_str=self.uuid)
                 if not antrag:
                     raise ValueError(f"Antrag {self.uuid} nicht gefunden")
 
-                antrag["status"] = Status.angenommen.value
-                perso_db.update_perso(discord_id=str(self.user_id), uuid_str=self.uuid, new_data=antrag)
+                antrag = {**antrag, "status": Status.angenommen.value}
+                await perso_db.update_perso_by_uuid(uuid_str=self.uuid, new_data=antrag)
                 
                 doc_type = "🚨 Gefälschter Ausweis" if self.is_fake else "✅ Ausweisantrag"
-                self.logger.info(f"Antrag {self.uuid} angenommen (Gefälscht: {self.is_fake})")
+                self.logger.info("Antrag %s angenommen (Gefälscht: %s)", self.uuid, self.is_fake)
 
                 fields = [
                     {"name": "Vorname & Nachname", "value": antrag["vollstaendiger_name"], "inline": False},
@@ -409,7 +460,7 @@ class ApprovalButtons(discord.ui.View):
                         color=discord.Color.orange() if self.is_fake else discord.Color.green()
                     ),
                     send_embed(
-                        channel_id=1392541223205605547,
+                        channel_id=config.database_channel,
                         title=f"{doc_type} angenommen - {antrag['vollstaendiger_name']}",
                         description=f"Antrag von <@{self.user_id}> wurde genehmigt.",
                         fields=fields,
@@ -430,7 +481,7 @@ class ApprovalButtons(discord.ui.View):
                 raise
 
         except Exception as e:
-            self.logger.error(f"Kritischer Fehler im Annahme-Prozess: {str(e)}")
+            self.logger.error("Kritischer Fehler im Annahme-Prozess: %s", e)
             try:
                 await interaction.followup.send(
                     "❌ Ein schwerwiegender Fehler ist aufgetreten!",
@@ -441,35 +492,37 @@ class ApprovalButtons(discord.ui.View):
             raise
 
     @discord.ui.button(label="Ablehnen", style=discord.ButtonStyle.danger, emoji="❌", custom_id="deny_btn")
+    @metrics.timed("view_callback", callback="deny")
     async def deny(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
             form_fields = ["Ablehnungs Grund"]
             modal = DynamicModal(form_fields, title="Ablehnungsgrund")
             await interaction.response.send_modal(modal)
-            self.logger.debug(f"Modal für Ablehnung von Antrag {self.uuid} angezeigt")
+            self.logger.debug("Modal für Ablehnung von Antrag %s angezeigt", self.uuid)
 
-            await modal.wait()
+            with metrics.waiting("reject_reason"):
+                await modal.wait()
 
             if not modal.data:
-                self.logger.warning(f"Modal für Antrag {self.uuid} wurde abgebrochen")
+                self.logger.warning("Modal für Antrag %s wurde abgebrochen", self.uuid)
                 return
 
             try:
                 message = await interaction.channel.fetch_message(self.id_a)
                 await message.delete()
                 await interaction.message.delete()
-                self.logger.debug(f"Nachricht für Antrag {self.uuid} gelöscht")
+                self.logger.debug("Nachricht für Antrag %s gelöscht", self.uuid)
             except discord.NotFound:
-                self.logger.warning(f"Nachricht für Antrag {self.uuid} bereits gelöscht")
+                self.logger.warning("Nachricht für Antrag %s bereits gelöscht", self.uuid)
             except Exception as e:
-                self.logger.error(f"Fehler beim Löschen der Nachricht: {str(e)}")
+                self.logger.error("Fehler beim Löschen der Nachricht: %s", e)
 
             try:
                 antrag = perso_db.get_perso_by_uuid(uuid_str=self.uuid)
                 if not antrag:
                     raise ValueError(f"Antrag mit UUID {self.uuid} nicht gefunden")
 
-                antrag["status"] = "abgelehnt"
+                antrag = {**antrag, "status": Status.abgelehnt.value}
 
                 fields = [
                     {"name": "Vorname & Nachname", "value": antrag["vollstaendiger_name"], "inline": False},
@@ -492,11 +545,11 @@ class ApprovalButtons(discord.ui.View):
                     color=discord.Color.red(),
                 )
 
-                perso_db.delete_perso(discord_id=str(self.user_id), uuid_str=self.uuid)
-                self.logger.info(f"Antrag {self.uuid} wurde abgelehnt mit Grund: {modal.data['Ablehnungs Grund']}")
+                await perso_db.delete_perso_by_uuid(uuid_str=self.uuid)
+                self.logger.info("Antrag %s wurde abgelehnt mit Grund: %s", self.uuid, modal.data['Ablehnungs Grund'])
 
                 await interaction.followup.send("Antrag wurde abgelehnt!", ephemeral=True)
-                self.logger.info(f"Benachrichtigung an User {self.user_id} gesendet")
+                self.logger.info("Benachrichtigung an User %s gesendet", self.user_id)
 
                 send_webhook_log(f"❌ <@{interaction.user.id}> hat {'gefälschten ' if self.is_fake else ''}Ausweis von <@{self.user_id}> mit UUID `{self.uuid}` **abgelehnt**.")
 
@@ -519,12 +572,14 @@ class DocumentTypeSelectView(discord.ui.View):
         self.logger = logger
 
     @discord.ui.button(label="Normaler Ausweis", style=discord.ButtonStyle.primary, emoji="📄")
+    @metrics.timed("view_callback", callback="normal_doc")
     async def normal_doc(self, interaction: discord.Interaction, button: discord.ui.Button):
         self.selected_type = "normal"
         await interaction.response.defer()
         self.stop()
 
     @discord.ui.button(label="Gefälschter Ausweis", style=discord.ButtonStyle.danger, emoji="🚨")
+    @metrics.timed("view_callback", callback="fake_doc")
     async def fake_doc(self, interaction: discord.Interaction, button: discord.ui.Button):
         self.selected_type = "fake"
         await interaction.response.defer()
@@ -536,15 +591,18 @@ class MyBot(commands.Bot):
         intents = discord.Intents.default()
         intents.message_content = True
         intents.guilds = True
-        super().__init__(command_prefix="$", intents=intents)
+        # REST-Aufrufe von discord.py und eigene HTTP-Anfragen landen in denselben Metriken
+        http_trace = http_trace_config(metrics)
+        super().__init__(command_prefix="$", intents=intents, http_trace=http_trace)
         self.registered_commands = []
         self.logger = logger
-        self._dev_guild = discord.Object(id=1273251270903337000)
+        self._dev_guild = discord.Object(id=config.guild_id)
+        self.http_client = HTTPClient(trace_configs=[http_trace])
 
     async def _ensure_bot_in_guild(self):
         try:
             guild = await self.fetch_guild(self._dev_guild.id)
-            self.logger.info(f"Bot ist auf Server: {guild.name} (ID: {guild.id})")
+            self.logger.info("Bot ist auf Server: %s (ID: %s)", guild.name, guild.id)
             return True
         except discord.Forbidden:
             self.logger.error("Bot hat keinen Zugriff auf den Server")
@@ -555,20 +613,33 @@ class MyBot(commands.Bot):
 
     async def setup_hook(self):
         self.logger.info("Starte Bot-Initialisierung...")
+        if config.loop_stall_threshold > 0:
+            await loop_monitor.start()
+        await lock_manager.start()
+        await self.http_client.start()
+        await webhook_logger.start(session=self.http_client.session)
+        await config.start()
+        if config.backups_enabled:
+            await backup_manager.start()
+        if config.metrics_port:
+            try:
+                await metrics_server.start()
+            except OSError as e:
+                self.logger.error("Metrik-Endpunkt konnte nicht gestartet werden: %s", e)
 
         if not await self._ensure_bot_in_guild():
             self.logger.warning("Sync für Dev-Server wird übersprungen")
 
         commands_list = list(self.tree.walk_commands())
-        self.logger.debug(f"Gefundene Commands: {len(commands_list)}")
+        self.logger.debug("Gefundene Commands: %s", len(commands_list))
 
         try:
             self.tree.copy_global_to(guild=self._dev_guild)
             synced = await self.tree.sync(guild=self._dev_guild)
 
-            self.logger.info(f"Erfolgreich synchronisiert: {len(synced)} Commands")
+            self.logger.info("Erfolgreich synchronisiert: %s Commands", len(synced))
             for cmd in synced:
-                self.logger.debug(f"-> /{cmd.name} (ID: {cmd.id})")
+                self.logger.debug("-> /%s (ID: %s)", cmd.name, cmd.id)
 
         except discord.Forbidden as e:
             if e.code == 50001:
@@ -576,48 +647,59 @@ class MyBot(commands.Bot):
             elif e.code == 50013:
                 self.logger.error("FEHLER: Fehlende Berechtigungen auf dem Server!")
         except Exception as e:
-            self.logger.error(f"Unerwarteter Fehler: {type(e).__name__} - {str(e)}")
+            self.logger.error("Unerwarteter Fehler: %s - %s", type(e).__name__, e)
+
+    async def close(self):
+        await lock_manager.stop()
+        await webhook_logger.stop()
+        await backup_manager.stop()
+        await metrics_server.stop()
+        await loop_monitor.stop()
+        await config.stop()
+        await self.http_client.close()
+        await perso_db.close()
+        await super().close()
 
     async def on_message(self, message):
         try:
             if message.author == self.user:
                 return
 
-            if message.author.id in [949997415027605514, 919586564764479490]:
+            if message.author.id in config.general_admins:
                 await self.process_commands(message)
-                self.logger.debug(f"Command von Nutzer {message.author.id} verarbeitet")
+                command_logger.debug("Command von Nutzer %s verarbeitet", message.author.id)
             else:
                 return
         except Exception as e:
-            self.logger.error(f"Fehler in on_message: {str(e)}", exc_info=True)
+            self.logger.error("Fehler in on_message: %s", e, exc_info=True)
 
     async def on_error(self, event, *args, **kwargs):
-        self.logger.error(f"Fehler in Event {event}: {str(args[0]) if args else 'Unbekannter Fehler'}", exc_info=True)
+        self.logger.error("Fehler in Event %s: %s", event, str(args[0]) if args else 'Unbekannter Fehler', exc_info=True)
 
     async def on_command_error(self, context, exception):
-        self.logger.error(f"Command-Fehler: {str(exception)}", exc_info=True)
+        self.logger.error("Command-Fehler: %s", exception, exc_info=True)
         if isinstance(exception, commands.CommandNotFound):
             return
         await context.send(f"⚠️ Ein Fehler ist aufgetreten: {str(exception)}")
 
 
 bot = MyBot()
+dm_cache = DMChannelCache(bot)
 
 
 @bot.event
 async def on_ready():
-    bot.logger.info(f'Eingeloggt als {bot.user} (ID: {bot.user.id})')
-    bot.logger.info(f'Bot ist bereit auf {len(bot.guilds)} Servern')
+    bot.logger.info("Eingeloggt als %s (ID: %s)", bot.user, bot.user.id)
+    bot.logger.info("Bot ist bereit auf %s Servern", len(bot.guilds))
     await bot.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name="deine Befehle"))
 
 
 @bot.tree.command(name="ausweis-erstellen", description="Erstelle einen normalen oder gefälschten Personalausweis")
+@metrics.timed("app_command", command="ausweis-erstellen")
 async def create_perso(interaction: discord.Interaction):
-    locks = load_locks()
-    user_id = str(interaction.user.id)
-    now = time.time()
-    if user_id in locks and now < locks[user_id]:
-        remaining = int((locks[user_id] - now) // 86400)
+    lock_remaining = lock_manager.remaining(str(interaction.user.id))
+    if lock_remaining is not None:
+        remaining = int(lock_remaining // 86400)
         embed = discord.Embed(
             title="⛔ Du wurdest gelockt",
             description=f"Verbleibende Zeit: **{remaining}** Tag(e)",
@@ -625,9 +707,9 @@ async def create_perso(interaction: discord.Interaction):
         )
         return await interaction.response.send_message(embed=embed, ephemeral=True)
 
-    if interaction.channel_id != 1429029371657846894:
+    if interaction.channel_id != config.creation_channel:
         return await interaction.response.send_message(
-            "Dieser Befehl kann nur im <#1429029371657846894> Channel verwendet werden.",
+            f"Dieser Befehl kann nur im <#{config.creation_channel}> Channel verwendet werden.",
             ephemeral=True
         )
     
@@ -641,7 +723,8 @@ async def create_perso(interaction: discord.Interaction):
     embed.add_field(name="🚨 Gefälschter Ausweis", value="Gefälschter Ausweis (für RP-Zwecke)", inline=False)
     
     await interaction.response.send_message(embed=embed, view=type_view, ephemeral=True)
-    await type_view.wait()
+    with metrics.waiting("doc_type"):
+        await type_view.wait()
     
     if not type_view.selected_type:
         return await interaction.followup.send("❌ Keine Auswahl getroffen.", ephemeral=True)
@@ -723,7 +806,8 @@ async def create_perso(interaction: discord.Interaction):
     
     view = OpenModalButton()
     await interaction.followup.send("Klicke auf den Button, um das Formular zu öffnen:", view=view, ephemeral=True)
-    await modal.wait()
+    with metrics.waiting("perso_form"):
+        await modal.wait()
 
     discord_userid = str(modal.discord_userid)
     data = modal.data
@@ -751,7 +835,7 @@ async def create_perso(interaction: discord.Interaction):
         if hasattr(perso, 'typ'):
             perso.typ = "G" if is_fake else "O"
 
-        uuid = perso_db.add_perso(discord_id=discord_userid, person=perso)
+        uuid = await perso_db.add_perso(discord_id=discord_userid, person=perso)
 
         fields = [
             {"name": "Vorname & Nachname", "value": data["Vorname & Nachname"], "inline": False},
@@ -774,12 +858,12 @@ async def create_perso(interaction: discord.Interaction):
 
         usr = interaction.user
 
-        a = await bot.get_channel(1392541330265083987).send('<@1400148859988213791>')
+        a = await bot.get_channel(config.approval_channel).send(f'<@{config.reviewer_id}>')
         a = a.id
         view = ApprovalButtons(user_id=int(discord_userid), uuid=uuid, a=a, is_fake=is_fake)
 
         await send_embed(
-            channel_id=1392541330265083987,
+            channel_id=config.approval_channel,
             author_name=usr.name,
             author_icon=usr.display_avatar.url,
             title=f"{doc_type} - Neuer Antrag",
@@ -792,10 +876,11 @@ async def create_perso(interaction: discord.Interaction):
 
 
 @bot.tree.command(name="ausweis-löschen", description="Lösche einen deiner Ausweise")
+@metrics.timed("app_command", command="ausweis-löschen")
 async def delete_perso(interaction: discord.Interaction):
-    if interaction.channel_id != 1429029371657846894:
+    if interaction.channel_id != config.creation_channel:
         await interaction.response.send_message(
-            "Dieser Befehl kann nur im <#1429029371657846894> Channel verwendet werden.", 
+            f"Dieser Befehl kann nur im <#{config.creation_channel}> Channel verwendet werden.", 
             ephemeral=True
         )
         return
@@ -824,10 +909,11 @@ async def delete_perso(interaction: discord.Interaction):
         view=view,
         ephemeral=True
     )
-    await view.wait()
+    with metrics.waiting("delete_select"):
+        await view.wait()
 
     if view.selected_value:
-        perso_db.delete_perso(uuid_str=str(view.selected_value), discord_id=str(user_id))
+        await perso_db.delete_perso(uuid_str=str(view.selected_value), discord_id=str(user_id))
         await interaction.followup.send(
             "✅ Ausweis wurde gelöscht",
             ephemeral=True
@@ -836,11 +922,12 @@ async def delete_perso(interaction: discord.Interaction):
 
 @bot.tree.command(name="ausweis-ansehen", description="Zeige einen Ausweis an (eigenen oder von anderen)")
 @app_commands.describe(user="Der User, dessen Ausweis angezeigt werden soll")
+@metrics.timed("app_command", command="ausweis-ansehen")
 async def show_perso(interaction: discord.Interaction, user: discord.Member):
     try:
-        if interaction.channel_id != 1429029510891835514:
+        if interaction.channel_id != config.show_channel:
             await interaction.response.send_message(
-                "Dieser Befehl kann nur im <#1429029510891835514> Channel verwendet werden.", 
+                f"Dieser Befehl kann nur im <#{config.show_channel}> Channel verwendet werden.", 
                 ephemeral=True
             )
             return
@@ -875,7 +962,8 @@ async def show_perso(interaction: discord.Interaction, user: discord.Member):
         view = DropdownView(options)
         await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
 
-        await view.wait()
+        with metrics.waiting("show_select"):
+            await view.wait()
 
         if not view.selected_value:
             return
@@ -923,7 +1011,8 @@ async def show_perso(interaction: discord.Interaction, user: discord.Member):
             confirmation_view = ConfirmationView()
             await user.send(embed=confirmation_embed, view=confirmation_view)
 
-            await confirmation_view.wait()
+            with metrics.waiting("show_confirmation"):
+                await confirmation_view.wait()
 
             if not confirmation_view.confirmed:
                 await interaction.followup.send(
@@ -966,7 +1055,7 @@ async def show_perso(interaction: discord.Interaction, user: discord.Member):
             )
 
     except Exception as e:
-        logger.error(f"Fehler in show-perso: {e}", exc_info=True)
+        logger.error("Fehler in show-perso: %s", e, exc_info=True)
         try:
             if not interaction.response.is_done():
                 await interaction.response.send_message(
@@ -979,15 +1068,37 @@ async def show_perso(interaction: discord.Interaction, user: discord.Member):
                     ephemeral=True
                 )
         except Exception as e:
-            logger.error(f"Fehler beim Senden der Fehlermeldung: {e}", exc_info=True)
+            logger.error("Fehler beim Senden der Fehlermeldung: %s", e, exc_info=True)
+
+
+def code_block_chunks(text: str, lang: str = "", limit: int = 2000) -> List[str]:
+    # Zeilenweise packen, damit jeder Block samt Code-Fence unter dem Nachrichtenlimit bleibt
+    budget = limit - len(f"```{lang}\n\n```")
+    # Zeilen als Liste statt als String sammeln, damit auch führende Leerzeilen erhalten bleiben
+    chunks, current, size = [], [], 0
+    for line in text.splitlines():
+        while len(line) > budget:
+            if current:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            chunks.append(line[:budget])
+            line = line[budget:]
+        extra = len(line) + (1 if current else 0)
+        if current and size + extra > budget:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+            extra = len(line)
+        current.append(line)
+        size += extra
+    if current:
+        chunks.append("\n".join(current))
+    return [f"```{lang}\n{chunk}\n```" for chunk in chunks]
 
 
 @bot.command()
 async def userdata(ctx, *, params: str):
     try:
-        allowed_users = {949997415027605514, 919586564764479490, 1400148859988213791}
-
-        if ctx.author.id not in allowed_users:
+        if ctx.author.id not in config.userdata_admins:
             return
 
         args = {}
@@ -1012,12 +1123,8 @@ async def userdata(ctx, *, params: str):
             ensure_ascii=False,
             default=str
         )
-        if len(formatted_data) <= 2000:
-            await ctx.send(f"```json\n{formatted_data}\n```")
-        else:
-            parts = [formatted_data[i:i + 2000] for i in range(0, len(formatted_data), 2000)]
-            for part in parts:
-                await ctx.send(f"```json\n{part}\n```")
+        for part in code_block_chunks(formatted_data, "json"):
+            await ctx.send(part)
 
     except ValueError as e:
         await ctx.send(f"⚠️ {str(e)}")
@@ -1027,12 +1134,195 @@ async def userdata(ctx, *, params: str):
         await ctx.send(f"❌ Unerwarteter Fehler: {str(e)}")
 
 
+@bot.command(name="export")
+async def export_db(ctx):
+    try:
+        if ctx.author.id not in config.general_admins:
+            return
+
+        status = await ctx.send("📦 Datenbank-Export läuft …")
+        fd, tmp_name = tempfile.mkstemp(suffix=".ndjson.gz")
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        try:
+            started = time.perf_counter()
+            count = await perso_db.export_ndjson_gz(tmp_path)
+            elapsed = time.perf_counter() - started
+            fname = f"personen_{time.strftime('%Y%m%d_%H%M%S')}.ndjson.gz"
+            limit = ctx.guild.filesize_limit if ctx.guild else 10 * 1024 * 1024
+            if tmp_path.stat().st_size > limit:
+                export_dir = Path("data/exports")
+                export_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path.replace(export_dir / fname)
+                return await status.edit(
+                    content=f"⚠️ {count} Ausweis(e) exportiert, die Datei ist zu groß für Discord "
+                            f"und liegt unter `{export_dir / fname}`."
+                )
+            await status.edit(content=f"✅ {count} Ausweis(e) exportiert ({elapsed:.1f}s).")
+            await ctx.send(file=discord.File(tmp_path, filename=fname))
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    except Exception as e:
+        await ctx.send(f"❌ Fehler beim Export: {e}")
+
+
+@bot.command(name="import")
+async def import_db(ctx):
+    try:
+        if ctx.author.id not in config.general_admins:
+            return
+
+        if not ctx.message.attachments:
+            return await ctx.send("⚠️ Bitte eine `.ndjson.gz`-Datei aus `$export` anhängen.")
+        attachment = ctx.message.attachments[0]
+        if not attachment.filename.endswith(".ndjson.gz"):
+            return await ctx.send("⚠️ Erwartet wird eine `.ndjson.gz`-Datei.")
+
+        status = await ctx.send("📥 Import läuft …")
+        fd, tmp_name = tempfile.mkstemp(suffix=".ndjson.gz")
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        try:
+            await attachment.save(tmp_path)
+            result = await perso_db.import_ndjson_gz(tmp_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        await status.edit(
+            content=f"✅ Import abgeschlossen: {result['imported']} neu, {result['skipped']} bereits vorhanden, "
+                    f"{result['invalid']} ungültig."
+        )
+        send_webhook_log(f"📥 <@{ctx.author.id}> hat {result['imported']} Ausweis(e) **importiert**.")
+
+    except (OSError, EOFError) as e:
+        await ctx.send(f"❌ Datei konnte nicht gelesen werden: {e}")
+    except Exception as e:
+        await ctx.send(f"❌ Fehler beim Import: {e}")
+
+
+@bot.command(name="backup")
+async def backup_cmd(ctx):
+    try:
+        if ctx.author.id not in config.general_admins:
+            return
+
+        generation = await backup_manager.backup_now()
+        if generation is None:
+            return await ctx.send("ℹ️ Keine Änderungen seit dem letzten Backup.")
+        await ctx.send(f"✅ Backup `{generation}` erstellt.")
+
+    except Exception as e:
+        await ctx.send(f"❌ Fehler beim Backup: {e}")
+
+
+@bot.command(name="restore")
+async def restore_cmd(ctx, generation: str = None):
+    try:
+        if ctx.author.id not in config.general_admins:
+            return
+
+        generations = backup_manager.generations()
+        if not generations:
+            return await ctx.send("📭 Keine Backups vorhanden.")
+        if generation is None:
+            listing = "\n".join(f"`{g}`" for g in reversed(generations))
+            return await ctx.send(f"🗂️ Verfügbare Backups (neuestes zuerst):\n{listing}\nVerwendung: `$restore <backup|latest>`")
+        if generation == "latest":
+            generation = generations[-1]
+
+        payloads = await asyncio.to_thread(backup_manager.load, generation)
+
+        confirm_msg = await ctx.send(
+            f"⚠️ **Backup `{generation}` wiederherstellen?** Aktuelle Ausweise und Locks werden ersetzt.\n"
+            "Reagiere mit ✅ innerhalb von 30 Sekunden zum Bestätigen."
+        )
+        await confirm_msg.add_reaction("✅")
+
+        def check(reaction, user):
+            return (
+                    user == ctx.author
+                    and str(reaction.emoji) == '✅'
+                    and reaction.message.id == confirm_msg.id
+            )
+
+        try:
+            await bot.wait_for('reaction_add', timeout=30.0, check=check)
+        except asyncio.TimeoutError:
+            return await ctx.send("Wiederherstellung abgebrochen (Timeout)")
+
+        if "personen" in payloads and not await perso_db.restore(payloads["personen"]):
+            return await ctx.send("❌ Ausweise konnten nicht wiederhergestellt werden.")
+        if "locks" in payloads:
+            lock_manager.restore(payloads["locks"])
+        await ctx.send(f"✅ Backup `{generation}` wiederhergestellt.")
+        send_webhook_log(f"🗂️ <@{ctx.author.id}> hat Backup `{generation}` **wiederhergestellt**.")
+
+    except FileNotFoundError as e:
+        await ctx.send(f"⚠️ {e}")
+    except Exception as e:
+        await ctx.send(f"❌ Fehler bei der Wiederherstellung: {e}")
+
+
+@bot.command(name="config")
+async def config_cmd(ctx, *, params: str = ""):
+    try:
+        if ctx.author.id not in config.general_admins:
+            return
+
+        # Format: SECTION.OPTION=wert, alle Änderungen werden in einem Schreibvorgang übernommen
+        updates = {}
+        for pair in params.split():
+            key, sep, value = pair.partition("=")
+            section, dot, option = key.partition(".")
+            if not sep or not dot:
+                raise ValueError(f"Ungültige Angabe `{pair}` (Verwendung: $config SECTION.OPTION=wert ...)")
+            updates.setdefault(section, {})[option] = value
+        if updates:
+            config.set_many(updates)
+
+        await ctx.send(
+            f"⚙️ Guild `{config.guild_id}` | Erstellung <#{config.creation_channel}> | Anzeige <#{config.show_channel}> | "
+            f"Annahme <#{config.approval_channel}> | Datenbank <#{config.database_channel}>\n"
+            f"Admins: {len(config.general_admins)} | Backups: {'an' if config.backups_enabled else 'aus'}"
+        )
+        pending = config.restart_pending()
+        if pending:
+            await ctx.send(f"🔁 Erst nach einem Neustart wirksam: {', '.join(f'`{key}`' for key in pending)}")
+
+    except ValueError as e:
+        await ctx.send(f"⚠️ {e}")
+    except Exception as e:
+        await ctx.send(f"❌ Fehler: {e}")
+
+
+@bot.command(name="stats")
+async def stats_cmd(ctx):
+    try:
+        if ctx.author.id not in config.general_admins:
+            return
+
+        rows = metrics.summary()
+        if not rows:
+            return await ctx.send("📭 Noch keine Messwerte vorhanden.")
+
+        lines = [f"{'Metrik':<36} {'Anzahl':>7} {'/s':>6} {'Ø ms':>8} {'p95 ms':>8} {'max ms':>8}"]
+        for row in rows:
+            name = f"{row['name']}:{row['labels']}" if row["labels"] else row["name"]
+            lines.append(
+                f"{name[:36]:<36} {row['count']:>7} {row['rate']:>6.2f} {row['avg_ms']:>8.1f} "
+                f"{row['p95_ms']:>8.1f} {row['max_ms']:>8.1f}"
+            )
+        for part in code_block_chunks("\n".join(lines)):
+            await ctx.send(part)
+
+    except Exception as e:
+        await ctx.send(f"❌ Fehler: {e}")
+
+
 @bot.command(name='stop')
 async def stop(ctx):
     try:
-        allowed_users = {949997415027605514, 919586564764479490}
-
-        if ctx.author.id not in allowed_users:
+        if ctx.author.id not in config.stop_admins:
             return
 
         confirm_msg = await ctx.send(
@@ -1066,8 +1356,7 @@ async def stop(ctx):
 @bot.command(name="get-channel")
 async def get_channel(ctx, *, args=None):
     try:
-        allowed_users = {949997415027605514, 919586564764479490}
-        if ctx.author.id not in allowed_users:
+        if ctx.author.id not in config.general_admins:
             return await ctx.send("❌ Keine Berechtigung.")
 
         params = dict(a.split("=", 1) for a in (args or "").split() if "=" in a)
@@ -1083,6 +1372,16 @@ async def get_channel(ctx, *, args=None):
         if not source_ch or not isinstance(source_ch, (discord.TextChannel, discord.Thread)):
             return await ctx.send(f"❌ Channel {source_ch_id} nicht gefunden/kein Textkanal.")
 
+        if str(params.get("sync", "false")).lower() in {"1", "true", "yes", "y"}:
+            status = await ctx.send("🔄 Synchronisiere …")
+            progress = ProgressReporter(status)
+            archive = Path("data/channel_archive") / f"channel_{source_ch_id}.ndjson"
+            result = await sync_channel(source_ch, archive, channel_checkpoints, progress)
+            return await progress.update(
+                f"✅ {result['messages']} neue Nachricht(en), {result['embeds']} Embed(s) an `{archive}` angehängt "
+                f"({progress.elapsed:.0f}s).", force=True
+            )
+
         target_ch = None
         if mirror:
             target_ch = (guild.get_channel(target_ch_id) if target_ch_id
@@ -1090,53 +1389,52 @@ async def get_channel(ctx, *, args=None):
             if not target_ch:
                 return await ctx.send("❌ Ziel-Channel ungültig.")
 
-        collected = []
-        async for msg in source_ch.history(limit=None, oldest_first=True):
-            if not msg.embeds:
-                continue
-            for emb in msg.embeds:
-                try:
-                    emb_dict = emb.to_dict()
-                except Exception:
-                    emb_dict = {
-                        "title": emb.title, 
-                        "description": emb.description,
-                        "url": emb.url, 
-                        "color": emb.color.value if emb.color else None,
-                        "timestamp": str(emb.timestamp) if emb.timestamp else None
-                    }
-                collected.append({
-                    "message_id": msg.id,
-                    "created_at": msg.created_at.isoformat(),
-                    "author_id": msg.author.id,
-                    "author_tag": str(msg.author),
-                    "embed": emb_dict,
-                })
-
-        if not collected:
-            return await ctx.send("📭 Keine Embeds gefunden.")
-
         if mirror:
-            await ctx.send(f"🔁 Starte Spiegelung von {len(collected)} Embed(s) → {target_ch.mention} …")
-            for i, item in enumerate(collected, 1):
-                try:
-                    e = discord.Embed.from_dict(item["embed"])
-                    await target_ch.send(embed=e)
-                except Exception as ex:
-                    await asyncio.sleep(1)
-                    await target_ch.send(f"⚠️ Embed #{i} konnte nicht gespiegelt werden: `{ex}`")
-                if i % 5 == 0:
-                    await asyncio.sleep(1.2)
-            return await ctx.send("✅ Spiegelung abgeschlossen.")
-
-        buf = io.BytesIO()
-        buf.write(json.dumps(collected, ensure_ascii=False, indent=2).encode("utf-8"))
-        buf.seek(0)
-        fname = f"embeds_g{guild_id}_c{source_ch_id}.json"
-        await ctx.send(
-            content=f"✅ {len(collected)} Embed(s) exportiert.",
-            file=discord.File(buf, filename=fname)
-        )
+            restart = str(params.get("restart", "false")).lower() in {"1", "true", "yes", "y"}
+            status = await ctx.send(f"🔁 Starte Spiegelung → {target_ch.mention} …")
+            progress = ProgressReporter(status)
+            result = await mirror_channel(source_ch, target_ch, channel_checkpoints, progress, restart=restart)
+            if not result["embeds"]:
+                return await progress.update("📭 Keine neuen Embeds gefunden.", force=True)
+            failed = f", {result['failed']} fehlgeschlagen" if result["failed"] else ""
+            return await progress.update(
+                f"✅ Spiegelung abgeschlossen: {result['embeds']} Embed(s) in {result['sends']} Nachricht(en){failed}, "
+                f"{result['elapsed']:.0f}s ({result['rate']:.1f} Embeds/s).", force=True
+            )
+
+        compress = str(params.get("gzip", "false")).lower() in {"1", "true", "yes", "y"}
+        suffix = ".ndjson.gz" if compress else ".ndjson"
+        fname = f"embeds_g{guild_id}_c{source_ch_id}{suffix}"
+        status = await ctx.send("📦 Export läuft …")
+        progress = ProgressReporter(status)
+
+        # Embeds werden direkt in eine Temp-Datei geschrieben, der Speicherbedarf bleibt konstant
+        fd, tmp_name = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        try:
+            with NDJSONWriter(tmp_path, compress=compress) as writer:
+                async for record in iter_embed_records(source_ch):
+                    writer.write(record)
+                    await progress.update(f"📦 {writer.count} Embed(s) exportiert … ({progress.elapsed:.0f}s)")
+
+            if not writer.count:
+                return await progress.update("📭 Keine Embeds gefunden.", force=True)
+
+            limit = ctx.guild.filesize_limit if ctx.guild else 10 * 1024 * 1024
+            if tmp_path.stat().st_size > limit:
+                export_dir = Path("data/exports")
+                export_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path.replace(export_dir / fname)
+                return await progress.update(
+                    f"⚠️ {writer.count} Embed(s) exportiert, die Datei ist zu groß für Discord "
+                    f"und liegt unter `{export_dir / fname}`.", force=True
+                )
+
+            await progress.update(f"✅ {writer.count} Embed(s) exportiert.", force=True)
+            await ctx.send(file=discord.File(tmp_path, filename=fname))
+        finally:
+            tmp_path.unlink(missing_ok=True)
 
     except Exception as e:
         await ctx.send(f"❌ Fehler: {e}")
@@ -1145,9 +1443,7 @@ async def get_channel(ctx, *, args=None):
 @bot.command()
 async def dellperso(ctx, *, params: str):
     try:
-        allowed_users = {949997415027605514, 919586564764479490, 1400148859988213791}
-
-        if ctx.author.id not in allowed_users:
+        if ctx.author.id not in config.dellperso_admins:
             return
 
         args = {}
@@ -1162,7 +1458,7 @@ async def dellperso(ctx, *, params: str):
         if 'id' not in args:
             raise ValueError("User-ID ist erforderlich (Verwendung: !dellperso uuid=12345678 id=USERID)")
 
-        deleted_data = perso_db.delete_perso(
+        deleted_data = await perso_db.delete_perso(
             discord_id=args["id"],
             uuid_str=args["uuid"]
         )
@@ -1188,8 +1484,82 @@ async def dellperso(ctx, *, params: str):
         print(f"Fehler in dellperso: {e}")
 
 
+@bot.command(name="lock")
+async def lock_user(ctx, *, params: str):
+    try:
+        if ctx.author.id not in config.lock_admins:
+            return
+
+        args = {}
+        for pair in params.split():
+            if '=' not in pair:
+                continue
+            key, value = pair.split('=', 1)
+            args[key.lower()] = value.strip()
+
+        if 'id' not in args or 'days' not in args:
+            raise ValueError("ID und Dauer sind erforderlich (Verwendung: $lock id=USERID days=7)")
+
+        days = float(args["days"])
+        if not math.isfinite(days) or days <= 0:
+            raise ValueError("Die Dauer muss größer als 0 sein")
+
+        expiry = lock_manager.add_lock(args["id"], days * 86400)
+        await ctx.send(f"⛔ User {args['id']} ist bis <t:{int(expiry)}:f> gelockt")
+
+    except ValueError as e:
+        await ctx.send(f"⚠️ Fehler: {str(e)}")
+    except Exception as e:
+        await ctx.send(f"❌ Kritischer Fehler: {str(e)}")
+
+
+@bot.command(name="unlock")
+async def unlock_user(ctx, *, params: str):
+    try:
+        if ctx.author.id not in config.lock_admins:
+            return
+
+        args = {}
+        for pair in params.split():
+            if '=' not in pair:
+                continue
+            key, value = pair.split('=', 1)
+            args[key.lower()] = value.strip()
+
+        if 'id' not in args:
+            raise ValueError("ID ist erforderlich (Verwendung: $unlock id=USERID)")
+
+        if not lock_manager.remove_lock(args["id"]):
+            return await ctx.send(f"❌ User {args['id']} ist nicht gelockt")
+        await ctx.send(f"✅ Lock für User {args['id']} aufgehoben")
+
+    except ValueError as e:
+        await ctx.send(f"⚠️ Fehler: {str(e)}")
+    except Exception as e:
+        await ctx.send(f"❌ Kritischer Fehler: {str(e)}")
+
+
+@bot.command(name="locks")
+async def list_locks(ctx):
+    if ctx.author.id not in config.lock_admins:
+        return
+
+    active = lock_manager.list_locks()
+    if not active:
+        return await ctx.send("✅ Aktuell ist niemand gelockt")
+
+    lines = [f"<@{user_id}> (`{user_id}`) bis <t:{int(expiry)}:f>" for user_id, expiry in active]
+    embed = discord.Embed(
+        title=f"⛔ Aktive Locks ({len(active)})",
+        description="\n".join(lines)[:4096],
+        color=discord.Color.red()
+    )
+    await ctx.send(embed=embed)
+
+
 @bot.tree.command(name="report", description="Sende einen Bugreport an das Dev-Team")
 @app_commands.describe(message="Beschreibe den Bug oder das Problem")
+@metrics.timed("app_command", command="report")
 async def report_bug(interaction: discord.Interaction, message: str):
     username = interaction.user.name
     webhook_url = "https://maker.ifttt.com/trigger/bugreport/with/key/jn0D3A447nffQoxXu4C6AkeklimS3o1wgqh-4kYfWz-"
@@ -1199,14 +1569,19 @@ async def report_bug(interaction: discord.Interaction, message: str):
         "value2": message
     }
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(webhook_url, json=payload) as response:
-            if response.status == 200:
-                await interaction.response.send_message(
-                    "✅ Bugreport erfolgreich gesendet.", ephemeral=True)
-            else:
-                await interaction.response.send_message(
-                    "❌ Fehler beim Senden des Bugreports.", ephemeral=True)
+    try:
+        async with bot.http_client.post(webhook_url, json=payload) as response:
+            success = response.status == 200
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error("Fehler beim Senden des Bugreports: %s", e)
+        success = False
+
+    if success:
+        await interaction.response.send_message(
+            "✅ Bugreport erfolgreich gesendet.", ephemeral=True)
+    else:
+        await interaction.response.send_message(
+            "❌ Fehler beim Senden des Bugreports.", ephemeral=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+import os
+import gzip
+import time
+import shutil
+import asyncio
+import hashlib
+import logging
+import orjson
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from moduals.file_utils import atomic_write
+
+
+class BackupManager:
+    def __init__(
+        self,
+        backup_dir: Path,
+        sources: Dict[str, Callable[[], bytes]],
+        keep: int = 5,
+        interval: float = 86400.0,
+    ):
+        self.backup_dir = backup_dir
+        self.sources = sources
+        self.keep = max(1, keep)
+        self.interval = interval
+        self.logger = logging.getLogger("SystemLogger")
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def generations(self) -> List[str]:
+        if not self.backup_dir.exists():
+            return []
+        return sorted(
+            p.name for p in self.backup_dir.iterdir()
+            if p.is_dir() and not p.name.startswith(".") and (p / "manifest.json").exists()
+        )
+
+    def _manifest(self, generation: str) -> Dict[str, dict]:
+        return orjson.loads((self.backup_dir / generation / "manifest.json").read_bytes())
+
+    def snapshot(self) -> Optional[str]:
+        payloads = {name: source() for name, source in self.sources.items()}
+        hashes = {name: hashlib.sha256(payload).hexdigest() for name, payload in payloads.items()}
+        generations = self.generations()
+        previous = generations[-1] if generations else None
+        prev_manifest = self._manifest(previous) if previous else {}
+        # Unveränderte Daten erzeugen keine neue Generation
+        if all(prev_manifest.get(name, {}).get("sha256") == digest for name, digest in hashes.items()):
+            return None
+
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        base = generation = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        n = 0
+        while (self.backup_dir / generation).exists():
+            n += 1
+            generation = f"{base}-{n:02d}"
+        tmp_dir = self.backup_dir / f".{generation}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+        manifest = {}
+        for name, payload in payloads.items():
+            filename = f"{name}.gz"
+            target = tmp_dir / filename
+            if prev_manifest.get(name, {}).get("sha256") == hashes[name]:
+                # Unveränderte Dateien werden per Hardlink aus der Vorgänger-Generation übernommen
+                try:
+                    os.link(self.backup_dir / previous / filename, target)
+                except OSError:
+                    shutil.copy2(self.backup_dir / previous / filename, target)
+            else:
+                atomic_write(target, gzip.compress(payload, compresslevel=6))
+            manifest[name] = {"sha256": hashes[name], "size": len(payload)}
+        atomic_write(tmp_dir / "manifest.json", orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_dir, self.backup_dir / generation)
+        self._rotate()
+        return generation
+
+    def _rotate(self):
+        for generation in self.generations()[:-self.keep]:
+            shutil.rmtree(self.backup_dir / generation, ignore_errors=True)
+
+    def load(self, generation: Optional[str] = None) -> Dict[str, bytes]:
+        generations = self.generations()
+        if not generations:
+            raise FileNotFoundError("Keine Backups vorhanden")
+        generation = generation or generations[-1]
+        if generation not in generations:
+            raise FileNotFoundError(f"Backup {generation} nicht gefunden")
+        payloads = {}
+        for name, meta in self._manifest(generation).items():
+            payload = gzip.decompress((self.backup_dir / generation / f"{name}.gz").read_bytes())
+            if hashlib.sha256(payload).hexdigest() != meta["sha256"]:
+                raise ValueError(f"Prüfsumme von {name} in Backup {generation} stimmt nicht")
+            payloads[name] = payload
+        return payloads
+
+    async def backup_now(self) -> Optional[str]:
+        async with self._lock:
+            return await asyncio.to_thread(self.snapshot)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="BackupManager")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _initial_delay(self) -> float:
+        generations = self.generations()
+        if not generations:
+            return 0.0
+        age = time.time() - (self.backup_dir / generations[-1]).stat().st_mtime
+        return max(0.0, self.interval - age)
+
+    async def _run(self):
+        delay = self._initial_delay()
+        while True:
+            await asyncio.sleep(delay)
+            delay = self.interval
+            try:
+                generation = await self.backup_now()
+                if generation:
+                    self.logger.info("Backup %s erstellt", generation)
+                else:
+                    self.logger.debug("Backup übersprungen, keine Änderungen")
+            except Exception as e:
+                self.logger.error("Backup fehlgeschlagen: %s", e)
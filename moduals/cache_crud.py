@@ -0,0 +1,72 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.pop(key, None)
+        return entry[0] if entry else None
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DMChannelCache:
+    def __init__(self, bot, maxsize: int = 1024, ttl: float = 3600.0, forbidden_ttl: float = 1800.0):
+        self.bot = bot
+        self._users = TTLCache(maxsize, ttl)
+        self._channels = TTLCache(maxsize, ttl)
+        self._forbidden = TTLCache(maxsize, forbidden_ttl)
+
+    async def get_user(self, user_id: int):
+        user = self.bot.get_user(user_id) or self._users.get(user_id)
+        if user is None:
+            user = await self.bot.fetch_user(user_id)
+            self._users.set(user_id, user)
+        return user
+
+    async def get_dm_channel(self, user_id: int):
+        channel = self._channels.get(user_id)
+        if channel is not None:
+            return channel
+        user = await self.get_user(user_id)
+        channel = user.dm_channel or await user.create_dm()
+        self._channels.set(user_id, channel)
+        return channel
+
+    def is_forbidden(self, user_id: int) -> bool:
+        return user_id in self._forbidden
+
+    def mark_forbidden(self, user_id: int):
+        self._forbidden.set(user_id, True)
+        self._channels.pop(user_id)
+
+    def forget(self, user_id: int):
+        self._users.pop(user_id)
+        self._channels.pop(user_id)
@@ -0,0 +1,245 @@
+import os
+import gzip
+import time
+import asyncio
+import orjson
+import discord
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from moduals.file_utils import atomic_write
+
+
+def embed_records(msg: discord.Message) -> List[dict]:
+    records = []
+    for emb in msg.embeds:
+        try:
+            emb_dict = emb.to_dict()
+        except Exception:
+            emb_dict = {
+                "title": emb.title,
+                "description": emb.description,
+                "url": emb.url,
+                "color": emb.color.value if emb.color else None,
+                "timestamp": str(emb.timestamp) if emb.timestamp else None
+            }
+        records.append({
+            "message_id": msg.id,
+            "created_at": msg.created_at.isoformat(),
+            "author_id": msg.author.id,
+            "author_tag": str(msg.author),
+            "embed": emb_dict,
+        })
+    return records
+
+
+async def iter_embed_records(
+    channel: discord.abc.Messageable, after: Optional[int] = None
+) -> AsyncIterator[dict]:
+    # history() lädt seitenweise nach, es liegt also nie der ganze Kanal im Speicher
+    after_obj = discord.Object(id=after) if after else None
+    async for msg in channel.history(limit=None, after=after_obj, oldest_first=True):
+        for record in embed_records(msg):
+            yield record
+
+
+class NDJSONWriter:
+    def __init__(self, path: Path, compress: bool = False, append: bool = False):
+        self.path = path
+        self.compress = compress
+        mode = "ab" if append else "wb"
+        self._file = gzip.open(path, mode, compresslevel=6) if compress else open(path, mode)
+        self.count = 0
+
+    def write(self, record: dict):
+        self._file.write(orjson.dumps(record) + b"\n")
+        self.count += 1
+
+    def flush(self):
+        self._file.flush()
+        if not self.compress:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ChannelCheckpoints:
+    def __init__(self, path: Path):
+        self.path = path
+        self.positions: Dict[str, int] = {}
+        if path.exists() and path.stat().st_size:
+            self.positions = {str(k): int(v) for k, v in orjson.loads(path.read_bytes()).items()}
+
+    def get(self, key) -> Optional[int]:
+        return self.positions.get(str(key))
+
+    def _write(self, payload: bytes):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, payload)
+
+    async def store(self, key, message_id: int):
+        # fsync von Datei und Verzeichnis im Thread, nicht auf dem Event-Loop
+        self.positions[str(key)] = int(message_id)
+        await asyncio.to_thread(self._write, orjson.dumps(self.positions, option=orjson.OPT_INDENT_2))
+
+
+async def sync_channel(
+    channel: discord.abc.Messageable,
+    archive: Path,
+    checkpoints: ChannelCheckpoints,
+    progress: Optional["ProgressReporter"] = None,
+    checkpoint_every: int = 500,
+) -> Dict[str, int]:
+    # Nur Nachrichten nach dem letzten Checkpoint laden und an das Archiv anhängen
+    after = checkpoints.get(channel.id)
+    archive.parent.mkdir(parents=True, exist_ok=True)
+    messages = 0
+    last_id = after
+    with NDJSONWriter(archive, append=True) as writer:
+        async for msg in channel.history(limit=None, after=discord.Object(id=after) if after else None, oldest_first=True):
+            for record in embed_records(msg):
+                writer.write(record)
+            messages += 1
+            last_id = msg.id
+            if messages % checkpoint_every == 0:
+                # Erst das Archiv sichern, dann den Checkpoint, sonst fehlen nach einem Absturz Einträge
+                await asyncio.to_thread(writer.flush)
+                await checkpoints.store(channel.id, last_id)
+            if progress is not None:
+                await progress.update(f"🔄 {messages} neue Nachricht(en), {writer.count} Embed(s) archiviert …")
+        await asyncio.to_thread(writer.flush)
+    if last_id is not None and last_id != after:
+        await checkpoints.store(channel.id, last_id)
+    return {"messages": messages, "embeds": writer.count, "last_id": last_id or 0}
+
+
+# Discord-Grenzen pro Nachricht
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+
+
+def pack_messages(items: List[Tuple[int, List[discord.Embed]]]) -> List[List[Tuple[int, List[discord.Embed]]]]:
+    # Ganze Quellnachrichten zusammenfassen, damit ein Checkpoint nie mitten in einer Nachricht liegt
+    batches, batch, count, chars = [], [], 0, 0
+    for message_id, embeds in items:
+        size = sum(len(e) for e in embeds)
+        if batch and (count + len(embeds) > MAX_EMBEDS or chars + size > MAX_EMBED_CHARS):
+            batches.append(batch)
+            batch, count, chars = [], 0, 0
+        batch.append((message_id, embeds))
+        count += len(embeds)
+        chars += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+async def mirror_channel(
+    source: discord.abc.Messageable,
+    target: discord.abc.Messageable,
+    checkpoints: ChannelCheckpoints,
+    progress: Optional["ProgressReporter"] = None,
+    restart: bool = False,
+    queue_size: int = 200,
+    checkpoint_every: int = 20,
+) -> Dict[str, float]:
+    key = f"mirror:{source.id}:{target.id}"
+    after = None if restart else checkpoints.get(key)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    stats = {"messages": 0, "embeds": 0, "sends": 0, "failed": 0}
+    started = time.monotonic()
+
+    async def produce():
+        # Das Laden der Historie läuft parallel zum Senden
+        try:
+            after_obj = discord.Object(id=after) if after else None
+            async for msg in source.history(limit=None, after=after_obj, oldest_first=True):
+                embeds = [discord.Embed.from_dict(r["embed"]) for r in embed_records(msg)]
+                if embeds:
+                    await queue.put((msg.id, embeds))
+        finally:
+            await queue.put(None)
+
+    async def send(embeds: List[discord.Embed]):
+        # Bucket-Header und 429-Wiederholungen übernimmt der HTTP-Client von discord.py
+        while True:
+            try:
+                return await target.send(embeds=embeds)
+            except discord.RateLimited as e:
+                await asyncio.sleep(e.retry_after)
+
+    producer = asyncio.create_task(produce())
+    # Nach einem Absturz werden höchstens checkpoint_every Blöcke doppelt gespiegelt
+    last_sent: Optional[int] = None
+    batches = 0
+    try:
+        done = False
+        while not done:
+            items = [await queue.get()]
+            while not queue.empty() and len(items) < MAX_EMBEDS:
+                items.append(queue.get_nowait())
+            if items[-1] is None:
+                items.pop()
+                done = True
+            for batch in pack_messages(items):
+                embeds = [e for _, msg_embeds in batch for e in msg_embeds]
+                try:
+                    await send(embeds)
+                    stats["sends"] += 1
+                except discord.HTTPException:
+                    # Einzelne ungültige Embeds sollen nicht den ganzen Block verlieren
+                    for embed in embeds:
+                        try:
+                            await send([embed])
+                            stats["sends"] += 1
+                        except discord.HTTPException:
+                            stats["failed"] += 1
+                stats["messages"] += len(batch)
+                stats["embeds"] += len(embeds)
+                last_sent = batch[-1][0]
+                batches += 1
+                if batches % checkpoint_every == 0:
+                    await checkpoints.store(key, last_sent)
+                if progress is not None:
+                    rate = stats["embeds"] / max(progress.elapsed, 0.001)
+                    await progress.update(f"🔁 {stats['embeds']} Embed(s) gespiegelt … ({rate:.1f}/s)")
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+        if last_sent is not None:
+            await checkpoints.store(key, last_sent)
+
+    stats["elapsed"] = time.monotonic() - started
+    stats["rate"] = stats["embeds"] / max(stats["elapsed"], 0.001)
+    return stats
+
+
+class ProgressReporter:
+    def __init__(self, message: discord.Message, interval: float = 5.0):
+        self.message = message
+        self.interval = interval
+        self.started = time.monotonic()
+        self._last = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    async def update(self, content: str, force: bool = False):
+        # Bearbeitungen drosseln, damit der Fortschritt nicht selbst ins Rate-Limit läuft
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        try:
+            await self.message.edit(content=content)
+        except discord.HTTPException:
+            pass
@@ -1,6 +1,11 @@
+import time
+import zlib
+import random
 import asyncio
 import hashlib
+import bisect
 import orjson
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 class DBClientError(Exception):
@@ -18,55 +23,652 @@ class DBClientError(Exception):
             parts.append(f"| Details: {self.details}")
         return " ".join(parts)
 
+class LatencyHistogram:
+    # Obergrenzen der Buckets in Millisekunden, der letzte Bucket ist offen
+    BOUNDS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        self.buckets[bisect.bisect_left(self.BOUNDS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        # Schätzung über die Bucket-Obergrenze, genau genug für Dashboards und Alarme
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.BOUNDS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(float(bound), self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else None,
+            "max_ms": self.max,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip([str(b) for b in self.BOUNDS] + ["inf"], self.buckets)),
+        }
+
+class _CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def check(self):
+        state = self.state
+        # Im Halboffen-Zustand darf genau eine Probeanfrage durch
+        if state == "open" or (state == "half_open" and self._probing):
+            raise DBClientError("Server nicht erreichbar, Anfrage abgewiesen", code=503, details={"circuit": state})
+        if state == "half_open":
+            self._probing = True
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def abandon(self):
+        self._probing = False
+
+    def failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+        self.reused = False
+        self.features: Set[str] = set()
+
+    @property
+    def healthy(self) -> bool:
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+class _MuxConnection(_Connection):
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        super().__init__(reader, writer)
+        # Einzelanfragen warten auf ein Future, Streams auf eine Queue
+        self.pending: Dict[int, Union[asyncio.Future, asyncio.Queue]] = {}
+        self.reader_task: Optional[asyncio.Task] = None
+        self.alive = True
+        self._next_rid = 0
+
+    def next_rid(self) -> int:
+        self._next_rid += 1
+        return self._next_rid
+
+    def fail_pending(self, error: Exception):
+        pending, self.pending = self.pending, {}
+        for target in pending.values():
+            if isinstance(target, asyncio.Queue):
+                target.put_nowait(error)
+            elif not target.done():
+                target.set_exception(error)
+
 class AsyncDBClient:
-    def __init__(self, host: str, port: int, handshake_key: str):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        handshake_key: str,
+        *,
+        min_size: int = 0,
+        max_size: int = 10,
+        idle_timeout: float = 60.0,
+        connect_timeout: float = 5.0,
+        request_timeout: Optional[float] = None,
+        multiplex: bool = False,
+        auto_batch: bool = False,
+        batch_window: float = 0.002,
+        max_batch: int = 100,
+        compression: bool = False,
+        compress_threshold: int = 1024,
+        max_frame_size: int = 16 * 1024 * 1024,
+        streaming: bool = False,
+        retries: int = 0,
+        retry_backoff: float = 0.05,
+        retry_max_backoff: float = 2.0,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 10.0,
+    ):
         self.host = host
         self.port = port
         self.handshake_key = handshake_key
         self.nonce = b"000000000000"
         self.aesgcm = AESGCM(hashlib.sha256(handshake_key.encode()).digest())
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self._idle: List[_Connection] = []
+        self._size = 0
+        self._cond = asyncio.Condition()
+        self._closed = False
+        self.request_timeout = request_timeout
+        self.multiplex = multiplex
+        self._mux: Optional[_MuxConnection] = None
+        self._mux_lock = asyncio.Lock()
+        self.auto_batch = auto_batch
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._batch: List[Tuple[dict, asyncio.Future, bool]] = []
+        self._batch_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self.compress_threshold = compress_threshold
+        self.max_frame_size = max_frame_size
+        self.features = (["zlib"] if compression else []) + (["stream"] if streaming else [])
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.retry_max_backoff = retry_max_backoff
+        self._breaker = _CircuitBreaker(breaker_threshold, breaker_reset)
+        self.latency: Dict[str, LatencyHistogram] = {
+            name: LatencyHistogram() for name in ("connect", "handshake", "request", "decode")
+        }
+        self.counters: Dict[str, int] = {"requests": 0, "failures": 0, "retries": 0, "rejected": 0}
 
-    async def send_command(self, command: dict) -> dict:
-        writer = None
-        try:
-            reader, writer = await asyncio.open_connection(self.host, self.port)
+    # Fehlercodes, die auf ein Transportproblem hindeuten und den Circuit Breaker speisen
+    TRANSIENT_CODES = frozenset({408, 503, 504})
 
-            auth_payload = orjson.dumps({"auth": self.handshake_key})
-            encrypted_auth = self.aesgcm.encrypt(self.nonce, auth_payload, None)
-            writer.write(len(encrypted_auth).to_bytes(4, "big") + encrypted_auth)
-            await writer.drain()
+    def stats(self) -> dict:
+        return {
+            "latency": {name: hist.snapshot() for name, hist in self.latency.items()},
+            "counters": dict(self.counters),
+            "circuit": self._breaker.state,
+            "pool": {"size": self._size, "idle": len(self._idle)},
+        }
 
-            hdr = await reader.readexactly(4)
-            enc_resp = await reader.readexactly(int.from_bytes(hdr, "big"))
-            auth_resp = orjson.loads(self.aesgcm.decrypt(self.nonce, enc_resp, None))
+    async def _write_frame(self, conn: _Connection, payload: dict):
+        body = orjson.dumps(payload)
+        if "zlib" in conn.features:
+            # Nach erfolgreicher Aushandlung trägt jeder Frame ein Flag-Byte: 0 = roh, 1 = zlib
+            if len(body) >= self.compress_threshold:
+                body = b"\x01" + zlib.compress(body)
+            else:
+                body = b"\x00" + body
+        encrypted = self.aesgcm.encrypt(self.nonce, body, None)
+        conn.writer.write(len(encrypted).to_bytes(4, "big") + encrypted)
+        await conn.writer.drain()
 
-            if auth_resp.get("status") != "OK":
-                raise DBClientError(auth_resp.get("msg", "Authentication failed"), code=401, details=auth_resp)
+    def _decompress(self, data: bytes) -> bytes:
+        # Begrenzte Ausgabe: ein kleiner Frame darf nicht zu beliebig viel Speicher aufgehen
+        decompressor = zlib.decompressobj()
+        body = decompressor.decompress(data, self.max_frame_size)
+        if decompressor.unconsumed_tail or not decompressor.eof:
+            raise DBClientError("Frame überschreitet max_frame_size oder ist unvollständig", code=413)
+        return body
 
-            command_payload = orjson.dumps(command)
-            encrypted_command = self.aesgcm.encrypt(self.nonce, command_payload, None)
-            writer.write(len(encrypted_command).to_bytes(4, "big") + encrypted_command)
-            await writer.drain()
+    async def _read_frame(self, conn: _Connection) -> dict:
+        hdr = await conn.reader.readexactly(4)
+        length = int.from_bytes(hdr, "big")
+        if length > self.max_frame_size + 64:
+            raise DBClientError("Frame überschreitet max_frame_size", code=413, details={"length": length})
+        encrypted = await conn.reader.readexactly(length)
+        started = time.perf_counter()
+        body = self.aesgcm.decrypt(self.nonce, encrypted, None)
+        if "zlib" in conn.features:
+            body = self._decompress(body[1:]) if body[:1] == b"\x01" else body[1:]
+        response = orjson.loads(body)
+        self.latency["decode"].observe(time.perf_counter() - started)
+        return response
 
-            hdr = await reader.readexactly(4)
-            enc_data = await reader.readexactly(int.from_bytes(hdr, "big"))
-            return orjson.loads(self.aesgcm.decrypt(self.nonce, enc_data, None))
+    async def _connect(self) -> _Connection:
+        started = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), timeout=self.connect_timeout
+            )
+        except asyncio.TimeoutError:
+            raise DBClientError("Zeitüberschreitung beim Verbindungsaufbau", code=504)
+        except (ConnectionRefusedError, OSError):
+            raise DBClientError("Verbindung zum Server konnte nicht aufgebaut werden", code=503)
+        self.latency["connect"].observe(time.perf_counter() - started)
 
+        started = time.perf_counter()
+        conn = _Connection(reader, writer)
+        auth_payload = {"auth": self.handshake_key}
+        if self.features:
+            auth_payload["features"] = self.features
+        try:
+            await self._write_frame(conn, auth_payload)
+            auth_resp = await asyncio.wait_for(self._read_frame(conn), timeout=self.connect_timeout)
+        except asyncio.TimeoutError:
+            await conn.close()
+            raise DBClientError("Zeitüberschreitung beim Handshake", code=504)
         except asyncio.IncompleteReadError:
+            await conn.close()
             raise DBClientError("Verbindung unterbrochen oder ungültige Antwort vom Server", code=408)
-        except ConnectionRefusedError:
-            raise DBClientError("Verbindung zum Server konnte nicht aufgebaut werden", code=503)
         except Exception as e:
+            await conn.close()
             raise DBClientError("Unerwarteter Fehler", details={"exception": str(e)})
+
+        if auth_resp.get("status") != "OK":
+            await conn.close()
+            raise DBClientError(auth_resp.get("msg", "Authentication failed"), code=401, details=auth_resp)
+        # Nur Features, die der Server bestätigt, werden genutzt (ältere Server senden keine)
+        conn.features = set(auth_resp.get("features", [])) & set(self.features)
+        self.latency["handshake"].observe(time.perf_counter() - started)
+        return conn
+
+    async def _acquire(self) -> _Connection:
+        if self._closed:
+            raise DBClientError("Client wurde geschlossen", code=503)
+        async with self._cond:
+            while True:
+                while self._idle:
+                    conn = self._idle.pop()
+                    expired = time.monotonic() - conn.last_used > self.idle_timeout
+                    if conn.healthy and not expired:
+                        return conn
+                    self._size -= 1
+                    await conn.close()
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                await self._cond.wait()
+        try:
+            return await self._connect()
+        except BaseException:
+            async with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    async def _release(self, conn: _Connection, discard: bool = False):
+        async with self._cond:
+            if discard or self._closed or not conn.healthy:
+                self._size -= 1
+                await conn.close()
+            else:
+                conn.last_used = time.monotonic()
+                conn.reused = True
+                self._idle.append(conn)
+            self._cond.notify()
+
+    async def start(self):
+        conns = []
+        try:
+            for _ in range(self.min_size - self._size):
+                conns.append(await self._acquire())
         finally:
-            if writer is not None:
-                writer.close()
-                await writer.wait_closed()
+            for conn in conns:
+                await self._release(conn)
+
+    async def _discard_idle(self):
+        async with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            await conn.close()
 
-    async def call(self, modul: str, funktion: str, data: list) -> dict:
+    async def close(self):
+        self._closed = True
+        if self._batch_handle is not None:
+            self._batch_handle.cancel()
+            self._batch_handle = None
+        batch, self._batch = self._batch, []
+        for _, fut, _ in batch:
+            if not fut.done():
+                fut.set_exception(DBClientError("Client wurde geschlossen", code=503))
+        # Bereits gesendete Sammelaufrufe laufen noch zu Ende, neue Verbindungen gibt es nicht mehr
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+        await self._discard_idle()
+        if self._mux is not None:
+            mux, self._mux = self._mux, None
+            mux.reader_task.cancel()
+            await asyncio.gather(mux.reader_task, return_exceptions=True)
+
+    async def _get_mux(self) -> _MuxConnection:
+        async with self._mux_lock:
+            if self._closed:
+                raise DBClientError("Client wurde geschlossen", code=503)
+            if self._mux is None or not self._mux.alive:
+                conn = await self._connect()
+                self._mux = _MuxConnection(conn.reader, conn.writer)
+                self._mux.features = conn.features
+                self._mux.reader_task = asyncio.create_task(self._mux_reader(self._mux))
+            return self._mux
+
+    async def _mux_reader(self, conn: _MuxConnection):
+        error = DBClientError("Verbindung unterbrochen oder ungültige Antwort vom Server", code=408)
+        try:
+            while True:
+                response = await self._read_frame(conn)
+                rid = response.pop("rid", None)
+                target = conn.pending.get(rid)
+                # Antworten auf abgebrochene oder abgelaufene Anfragen werden verworfen
+                if isinstance(target, asyncio.Queue):
+                    target.put_nowait(response)
+                    if response.get("end") or response.get("status") == "ERROR":
+                        conn.pending.pop(rid, None)
+                elif target is not None:
+                    conn.pending.pop(rid, None)
+                    if not target.done():
+                        target.set_result(response)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            error = DBClientError("Client wurde geschlossen", code=503)
+        except DBClientError as e:
+            error = e
+        except Exception as e:
+            error = DBClientError("Unerwarteter Fehler", details={"exception": str(e)})
+        finally:
+            conn.alive = False
+            conn.fail_pending(error)
+            await conn.close()
+
+    async def _send_multiplexed(self, command: dict, timeout: Optional[float]) -> dict:
+        conn = await self._get_mux()
+        rid = conn.next_rid()
+        fut = asyncio.get_running_loop().create_future()
+        conn.pending[rid] = fut
+        try:
+            await self._write_frame(conn, {**command, "rid": rid})
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            raise DBClientError("Zeitüberschreitung der Anfrage", code=504, details={"rid": rid})
+        except ConnectionError:
+            raise DBClientError("Verbindung unterbrochen oder ungültige Antwort vom Server", code=408)
+        finally:
+            conn.pending.pop(rid, None)
+
+    async def send_command(self, command: dict, timeout: Optional[float] = None, idempotent: bool = False) -> dict:
+        timeout = self.request_timeout if timeout is None else timeout
+        attempt = 0
+        while True:
+            try:
+                return await self._send_once(command, timeout, idempotent)
+            except DBClientError as e:
+                # Nur idempotente Aufrufe dürfen nach Transportfehlern wiederholt werden,
+                # ein offener Circuit Breaker soll dagegen sofort durchschlagen
+                if not idempotent or attempt >= self.retries or e.code not in self.TRANSIENT_CODES or "circuit" in e.details:
+                    raise
+            attempt += 1
+            self.counters["retries"] += 1
+            ceiling = min(self.retry_max_backoff, self.retry_backoff * 2 ** (attempt - 1))
+            await asyncio.sleep(random.uniform(0, ceiling))
+
+    async def _send_once(self, command: dict, timeout: Optional[float], idempotent: bool = False) -> dict:
+        try:
+            self._breaker.check()
+        except DBClientError:
+            self.counters["rejected"] += 1
+            raise
+        self.counters["requests"] += 1
+        started = time.perf_counter()
+        try:
+            if self.multiplex:
+                response = await self._send_multiplexed(command, timeout)
+            else:
+                try:
+                    response = await asyncio.wait_for(self._send_pooled(command, idempotent), timeout)
+                except asyncio.TimeoutError:
+                    raise DBClientError("Zeitüberschreitung der Anfrage", code=504)
+            if response.get("status") == "ERROR" and response.get("code") in self.TRANSIENT_CODES:
+                # Meldet der Server selbst einen vorübergehenden Fehler, gilt er wie ein Transportfehler
+                raise DBClientError(response.get("msg", "Server nicht verfügbar"), code=response["code"], details=response)
+        except DBClientError as e:
+            self.counters["failures"] += 1
+            if e.code in self.TRANSIENT_CODES:
+                self._breaker.failure()
+            else:
+                self._breaker.success()
+            raise
+        except asyncio.CancelledError:
+            # Der Aufrufer hat abgebrochen, das sagt nichts über den Server aus
+            self._breaker.abandon()
+            raise
+        self.latency["request"].observe(time.perf_counter() - started)
+        self._breaker.success()
+        return response
+
+    async def _send_pooled(self, command: dict, idempotent: bool = False) -> dict:
+        resent = False
+        while True:
+            conn = await self._acquire()
+            written = False
+            try:
+                await self._write_frame(conn, command)
+                written = True
+                response = await self._read_frame(conn)
+            except (asyncio.IncompleteReadError, ConnectionError) as e:
+                await self._release(conn, discard=True)
+                # Eine wiederverwendete Verbindung wurde serverseitig geschlossen, bevor eine Antwort kam.
+                # Kam der Befehl schon an, darf er nur bei idempotenten Aufrufen erneut gesendet werden
+                stale = not isinstance(e, asyncio.IncompleteReadError) or not e.partial
+                if conn.reused and stale and not resent and (idempotent or not written):
+                    resent = True
+                    # Die übrigen Leerlauf-Verbindungen stammen vermutlich aus derselben Serversitzung
+                    await self._discard_idle()
+                    continue
+                raise DBClientError("Verbindung unterbrochen oder ungültige Antwort vom Server", code=408)
+            except (asyncio.CancelledError, DBClientError):
+                # Die Antwort steht noch aus bzw. ist unbrauchbar, die Verbindung ist nicht mehr synchron
+                await self._release(conn, discard=True)
+                raise
+            except Exception as e:
+                await self._release(conn, discard=True)
+                raise DBClientError("Unerwarteter Fehler", details={"exception": str(e)})
+            await self._release(conn)
+            return response
+
+    async def call(
+        self, modul: str, funktion: str, data: list, timeout: Optional[float] = None, idempotent: bool = False
+    ) -> dict:
+        if self.auto_batch:
+            return await self._call_batched({"modul": modul, "funktion": funktion, "data": data}, timeout, idempotent)
         return await self.send_command({
             "action": "call",
             "modul": modul,
             "funktion": funktion,
             "data": data
-        })
+        }, timeout=timeout, idempotent=idempotent)
+
+    async def _call_many_raw(
+        self, calls: List[dict], timeout: Optional[float] = None, idempotent: bool = False
+    ) -> List[dict]:
+        response = await self.send_command({"action": "call_many", "calls": calls}, timeout=timeout, idempotent=idempotent)
+        results = response.get("results")
+        if response.get("status") != "OK" or not isinstance(results, list) or len(results) != len(calls):
+            raise DBClientError(response.get("msg", "Ungültige Antwort auf call_many"), code=response.get("code"), details=response)
+        return results
+
+    async def call_many(
+        self, calls: List[Tuple[str, str, list]], timeout: Optional[float] = None, idempotent: bool = False
+    ) -> List[Union[dict, DBClientError]]:
+        results = await self._call_many_raw(
+            [{"modul": modul, "funktion": funktion, "data": data} for modul, funktion, data in calls], timeout, idempotent
+        )
+        # Fehlgeschlagene Einzelaufrufe werden als DBClientError an ihrer Position zurückgegeben
+        return [
+            DBClientError(result.get("msg", "Aufruf fehlgeschlagen"), code=result.get("code"), details={"index": i, **result})
+            if result.get("status") == "ERROR" else result
+            for i, result in enumerate(results)
+        ]
+
+    async def _call_batched(self, call: dict, timeout: Optional[float], idempotent: bool = False) -> dict:
+        if self._closed:
+            raise DBClientError("Client wurde geschlossen", code=503)
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._batch.append((call, fut, idempotent))
+        if len(self._batch) >= self.max_batch:
+            self._flush_batch()
+        elif self._batch_handle is None:
+            self._batch_handle = loop.call_later(self.batch_window, self._flush_batch)
+        timeout = self.request_timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            raise DBClientError("Zeitüberschreitung der Anfrage", code=504)
+
+    def _flush_batch(self):
+        if self._batch_handle is not None:
+            self._batch_handle.cancel()
+            self._batch_handle = None
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._send_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _send_batch(self, batch: List[Tuple[dict, asyncio.Future, bool]]):
+        # Ein Sammelaufruf wird nur wiederholt, wenn jeder enthaltene Aufruf idempotent ist
+        idempotent = all(flag for _, _, flag in batch)
+        try:
+            if len(batch) == 1:
+                results = [await self.send_command({"action": "call", **batch[0][0]}, idempotent=idempotent)]
+            else:
+                results = await self._call_many_raw([call for call, _, _ in batch], idempotent=idempotent)
+        except DBClientError as e:
+            for _, fut, _ in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut, _), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
+
+    async def stream(
+        self, modul: str, funktion: str, data: list, chunk_size: int = 500, timeout: Optional[float] = None
+    ) -> AsyncIterator[Any]:
+        command = {
+            "action": "call",
+            "modul": modul,
+            "funktion": funktion,
+            "data": data,
+            "stream": True,
+            "chunk_size": chunk_size,
+        }
+        timeout = self.request_timeout if timeout is None else timeout
+        try:
+            self._breaker.check()
+        except DBClientError:
+            self.counters["rejected"] += 1
+            raise
+        self.counters["requests"] += 1
+        started = time.perf_counter()
+        if self.multiplex:
+            frames = self._stream_multiplexed(command, timeout)
+        else:
+            frames = self._stream_pooled(command, timeout)
+        settled = False
+        try:
+            async for frame in frames:
+                if frame.get("status") == "ERROR":
+                    raise DBClientError(frame.get("msg", "Stream fehlgeschlagen"), code=frame.get("code"), details=frame)
+                if "chunk" not in frame or frame.get("end"):
+                    # Die Antwort ist vollständig angekommen, auch wenn der Aufrufer danach abbricht
+                    settled = True
+                    self.latency["request"].observe(time.perf_counter() - started)
+                    self._breaker.success()
+                if "chunk" not in frame and not frame.get("end"):
+                    # Server ohne Streaming-Unterstützung: vollständige Antwort als einziger Block
+                    result = frame.get("result")
+                    for item in (result if isinstance(result, list) else [result]):
+                        yield item
+                    return
+                for item in frame.get("chunk", []):
+                    yield item
+                if frame.get("end"):
+                    return
+        except DBClientError as e:
+            if not settled:
+                settled = True
+                self.counters["failures"] += 1
+                if e.code in self.TRANSIENT_CODES:
+                    self._breaker.failure()
+                else:
+                    self._breaker.success()
+            raise
+        finally:
+            if not settled:
+                # cancel() oder ein vorzeitiges aclose() sagen nichts über den Server aus
+                self._breaker.abandon()
+            await frames.aclose()
+
+    async def _stream_pooled(self, command: dict, timeout: Optional[float]) -> AsyncIterator[dict]:
+        conn = await self._acquire()
+        if "stream" not in conn.features:
+            command = {k: v for k, v in command.items() if k not in ("stream", "chunk_size")}
+        finished = False
+        try:
+            await self._write_frame(conn, command)
+            while True:
+                frame = await asyncio.wait_for(self._read_frame(conn), timeout)
+                finished = "chunk" not in frame or frame.get("end") or frame.get("status") == "ERROR"
+                yield frame
+                if finished:
+                    return
+        except asyncio.TimeoutError:
+            raise DBClientError("Zeitüberschreitung der Anfrage", code=504)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            raise DBClientError("Verbindung unterbrochen oder ungültige Antwort vom Server", code=408)
+        finally:
+            # Ein vorzeitig abgebrochener Stream lässt ungelesene Frames zurück
+            await self._release(conn, discard=not finished)
+
+    async def _stream_multiplexed(self, command: dict, timeout: Optional[float]) -> AsyncIterator[dict]:
+        conn = await self._get_mux()
+        if "stream" not in conn.features:
+            yield await self._send_multiplexed(
+                {k: v for k, v in command.items() if k not in ("stream", "chunk_size")}, timeout
+            )
+            return
+        rid = conn.next_rid()
+        queue: asyncio.Queue = asyncio.Queue()
+        conn.pending[rid] = queue
+        try:
+            await self._write_frame(conn, {**command, "rid": rid})
+            while True:
+                frame = await asyncio.wait_for(queue.get(), timeout)
+                if isinstance(frame, Exception):
+                    raise frame
+                yield frame
+                if frame.get("end") or frame.get("status") == "ERROR":
+                    return
+        except asyncio.TimeoutError:
+            raise DBClientError("Zeitüberschreitung der Anfrage", code=504, details={"rid": rid})
+        except ConnectionError:
+            raise DBClientError("Verbindung unterbrochen oder ungültige Antwort vom Server", code=408)
+        finally:
+            conn.pending.pop(rid, None)
@@ -0,0 +1,201 @@
+import sys
+import zlib
+import random
+import asyncio
+import hashlib
+import inspect
+import orjson
+from typing import Callable, Dict, Optional, Set
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+
+class AsyncDBServer:
+    SUPPORTED_FEATURES = ("zlib", "stream")
+
+    def __init__(
+        self, host: str, port: int, handshake_key: str, compress_threshold: int = 1024,
+        max_frame_size: int = 16 * 1024 * 1024,
+    ):
+        self.host = host
+        self.port = port
+        self.handshake_key = handshake_key
+        self.nonce = b"000000000000"
+        self.aesgcm = AESGCM(hashlib.sha256(handshake_key.encode()).digest())
+        self.handlers: Dict[str, Dict[str, Callable]] = {}
+        self.connections = 0
+        self.compress_threshold = compress_threshold
+        self.max_frame_size = max_frame_size
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.drop_rate = 0.0
+        self.error_rate = 0.0
+        self.fault_delay = 0.0
+        self._random = random.Random()
+        self.register("system", "echo", lambda data: data)
+
+    def register(self, modul: str, funktion: str, handler: Callable):
+        self.handlers.setdefault(modul, {})[funktion] = handler
+
+    def inject_faults(self, drop_rate: float = 0.0, error_rate: float = 0.0, delay: float = 0.0, seed: Optional[int] = None):
+        # Fehlerinjektion für Tests: Verbindung kappen, 503 antworten oder Antworten verzögern
+        self.drop_rate = drop_rate
+        self.error_rate = error_rate
+        self.fault_delay = delay
+        if seed is not None:
+            self._random.seed(seed)
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # Bei port=0 den tatsächlich vergebenen Port übernehmen
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _read_frame(self, reader: asyncio.StreamReader, features: Set[str]) -> dict:
+        hdr = await reader.readexactly(4)
+        length = int.from_bytes(hdr, "big")
+        if length > self.max_frame_size + 64:
+            raise ValueError(f"Frame mit {length} Bytes überschreitet max_frame_size")
+        encrypted = await reader.readexactly(length)
+        body = self.aesgcm.decrypt(self.nonce, encrypted, None)
+        if "zlib" in features and body[:1] == b"\x01":
+            decompressor = zlib.decompressobj()
+            body = decompressor.decompress(body[1:], self.max_frame_size)
+            if decompressor.unconsumed_tail or not decompressor.eof:
+                raise ValueError("Dekomprimierter Frame überschreitet max_frame_size")
+        elif "zlib" in features:
+            body = body[1:]
+        return orjson.loads(body)
+
+    async def _write_frame(self, writer: asyncio.StreamWriter, features: Set[str], payload: dict):
+        body = orjson.dumps(payload)
+        if "zlib" in features:
+            if len(body) >= self.compress_threshold:
+                body = b"\x01" + zlib.compress(body)
+            else:
+                body = b"\x00" + body
+        encrypted = self.aesgcm.encrypt(self.nonce, body, None)
+        writer.write(len(encrypted).to_bytes(4, "big") + encrypted)
+        await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        self.connections += 1
+        try:
+            features: Set[str] = set()
+            auth = await self._read_frame(reader, features)
+            if auth.get("auth") != self.handshake_key:
+                await self._write_frame(writer, features, {"status": "ERROR", "msg": "Authentication failed"})
+                return
+            accepted = [f for f in auth.get("features", []) if f in self.SUPPORTED_FEATURES]
+            auth_resp = {"status": "OK"}
+            if accepted:
+                auth_resp["features"] = accepted
+            await self._write_frame(writer, features, auth_resp)
+            features.update(accepted)
+            while True:
+                command = await self._read_frame(reader, features)
+                if "rid" in command:
+                    # Gemultiplexte Anfragen parallel bearbeiten, Antworten tragen die rid
+                    child = asyncio.create_task(self._respond(writer, features, command))
+                    self._tasks.add(child)
+                    child.add_done_callback(self._tasks.discard)
+                else:
+                    await self._respond(writer, features, command)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # stop() bricht offene Verbindungen ab, das ist kein Fehler
+            pass
+        except Exception as e:
+            print(f"[ERROR] AsyncDBServer: {e}")
+        finally:
+            self._tasks.discard(task)
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, features: Set[str], command: dict):
+        if self.fault_delay:
+            await asyncio.sleep(self.fault_delay)
+        if self.drop_rate and self._random.random() < self.drop_rate:
+            writer.transport.abort()
+            return
+        if self.error_rate and self._random.random() < self.error_rate:
+            response = {"status": "ERROR", "msg": "Injizierter Fehler", "code": 503}
+            if "rid" in command:
+                response["rid"] = command["rid"]
+            try:
+                await self._write_frame(writer, features, response)
+            except ConnectionError:
+                pass
+            return
+        if command.get("stream") and "stream" in features:
+            return await self._respond_stream(writer, features, command)
+        response = await self.dispatch(command)
+        if "rid" in command:
+            response["rid"] = command["rid"]
+        try:
+            await self._write_frame(writer, features, response)
+        except ConnectionError:
+            pass
+
+    async def _respond_stream(self, writer: asyncio.StreamWriter, features: Set[str], command: dict):
+        extra = {"rid": command["rid"]} if "rid" in command else {}
+        response = await self.dispatch(command)
+        try:
+            if response.get("status") != "OK":
+                await self._write_frame(writer, features, {**response, "end": True, **extra})
+                return
+            result = response["result"]
+            items = result if isinstance(result, list) else [result]
+            size = max(1, int(command.get("chunk_size") or 500))
+            # Jeder Block ist ein eigener, unabhängig verschlüsselter Frame
+            for i in range(0, len(items), size):
+                await self._write_frame(writer, features, {"status": "OK", "chunk": items[i:i + size], **extra})
+            await self._write_frame(writer, features, {"status": "OK", "end": True, **extra})
+        except ConnectionError:
+            pass
+
+    async def dispatch(self, command: dict) -> dict:
+        if command.get("action") == "call_many":
+            results = await asyncio.gather(*(
+                self.dispatch({"action": "call", **call}) for call in command.get("calls", [])
+            ))
+            return {"status": "OK", "results": list(results)}
+        if command.get("action") != "call":
+            return {"status": "ERROR", "msg": f"Unbekannte Aktion: {command.get('action')}", "code": 400}
+        handler = self.handlers.get(command.get("modul"), {}).get(command.get("funktion"))
+        if handler is None:
+            return {"status": "ERROR", "msg": "Unbekannte Funktion", "code": 404}
+        try:
+            result = handler(command.get("data"))
+            if inspect.isawaitable(result):
+                result = await result
+            return {"status": "OK", "result": result}
+        except Exception as e:
+            return {"status": "ERROR", "msg": str(e), "code": 500}
+
+
+async def _serve(host: str, port: int, handshake_key: str):
+    server = AsyncDBServer(host, port, handshake_key)
+    await server.start()
+    print(f"AsyncDBServer läuft auf {host}:{server.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Verwendung: python -m moduals.con_server <host> <port> <handshake_key>")
+        sys.exit(1)
+    try:
+        asyncio.run(_serve(sys.argv[1], int(sys.argv[2]), sys.argv[3]))
+    except KeyboardInterrupt:
+        pass
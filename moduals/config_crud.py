@@ -0,0 +1,154 @@
+import os
+import asyncio
+import logging
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from moduals.ini_crud import INIManager
+
+# Bisher fest im Code hinterlegte Werte, gelten solange die INI Platzhalter enthält
+DEFAULT_ADMINS = (949997415027605514, 919586564764479490)
+DEFAULT_REVIEWER = 1400148859988213791
+
+# Werden nur beim Start gelesen (Datenbank, Log-Dateien, Metrik-Endpunkt, Loop-Monitor)
+RESTART_REQUIRED = (
+    ("VARS", "PersoWriteBehind"),
+    ("VARS", "PersoFlushInterval"),
+    ("VARS", "PersoJournal"),
+    ("VARS", "PersoJournalCompactSize"),
+    ("VARS", "LogMaxBytes"),
+    ("VARS", "LogBackupCount"),
+    ("VARS", "LogRotateInterval"),
+    ("VARS", "MetricsPort"),
+    ("VARS", "LoopMonitorInterval"),
+    ("VARS", "LoopStallThreshold"),
+    ("FILES", "PersoBackend"),
+    ("FILES", "DebugLog"),
+)
+
+
+class BotConfig:
+    def __init__(self, ini: INIManager, poll_interval: float = 5.0):
+        self.ini = ini
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger("SystemLogger")
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[], None]] = []
+        self._stamp = self._file_stamp()
+        self._build()
+        self._startup_values = self._restart_values()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.ini.file_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _id(self, section: str, option: str, default: Optional[int]) -> Optional[int]:
+        raw = self.ini.get(section, option)
+        if raw is None:
+            return default
+        try:
+            return int(raw.strip())
+        except ValueError:
+            return default
+
+    def _ids(self, section: str, option: str, default: Iterable[int]) -> FrozenSet[int]:
+        raw = self.ini.get(section, option)
+        if raw is None:
+            return frozenset(default)
+        try:
+            return frozenset(int(part) for part in raw.split(",") if part.strip())
+        except ValueError:
+            self.logger.warning("Ungültige ID-Liste in [%s] %s, Standardwerte aktiv", section, option)
+            return frozenset(default)
+
+    def _build(self):
+        ini = self.ini
+        self.guild_id = self._id("DISCORD", "GUILD", 1273251270903337000)
+        self.creation_channel = self._id("DISCORD", "CREATION", 1429029371657846894)
+        self.show_channel = self._id("DISCORD", "SHOW", 1429029510891835514)
+        self.approval_channel = self._id("DISCORD", "APPROVAL", 1392541330265083987)
+        self.database_channel = self._id("DISCORD", "DATABASE", 1392541223205605547)
+        self.reviewer_id = self._id("DISCORD", "REVIEWER", DEFAULT_REVIEWER)
+
+        self.general_admins = self._ids("COMMANDS", "GENERAL", DEFAULT_ADMINS)
+        self.stop_admins = self._ids("COMMANDS", "STOP", DEFAULT_ADMINS)
+        self.dellperso_admins = self._ids("COMMANDS", "DELLPERSO", DEFAULT_ADMINS + (DEFAULT_REVIEWER,))
+        self.userdata_admins = self._ids("COMMANDS", "USERDATA", DEFAULT_ADMINS + (DEFAULT_REVIEWER,))
+        self.lock_admins = self._ids("COMMANDS", "LOCK", DEFAULT_ADMINS + (DEFAULT_REVIEWER,))
+
+        self.select_placeholder = ini.get("VARS", "DynamicSelectPlaceholder", fallback="Wähle eine Option...")
+        self.backups_enabled = ini.get_bool("VARS", "BackUps", fallback=False)
+        self.backups_keep = ini.get_int("VARS", "BackUpsFile", fallback=5)
+        self.backups_interval = ini.get_float("VARS", "BackUpsTime", fallback=86400.0)
+        self.perso_write_behind = ini.get_bool("VARS", "PersoWriteBehind", fallback=False)
+        self.perso_flush_interval = ini.get_float("VARS", "PersoFlushInterval", fallback=2.0)
+        self.perso_journal = ini.get_bool("VARS", "PersoJournal", fallback=False)
+        self.perso_compact_size = ini.get_int("VARS", "PersoJournalCompactSize", fallback=4 * 1024 * 1024)
+        self.log_max_bytes = ini.get_int("VARS", "LogMaxBytes", fallback=10 * 1024 * 1024)
+        self.log_backup_count = ini.get_int("VARS", "LogBackupCount", fallback=7)
+        self.log_rotate_interval = ini.get_float("VARS", "LogRotateInterval", fallback=86400.0)
+        self.log_debug_sample_rate = ini.get_float("VARS", "LogDebugSampleRate", fallback=1.0)
+        self.metrics_port = ini.get_int("VARS", "MetricsPort", fallback=9108)
+        self.loop_monitor_interval = ini.get_float("VARS", "LoopMonitorInterval", fallback=0.25)
+        self.loop_stall_threshold = ini.get_float("VARS", "LoopStallThreshold", fallback=0.5)
+
+        self.perso_backend = ini.get("FILES", "PersoBackend", fallback="json")
+        self.debug_log = ini.get("FILES", "DebugLog", fallback="app_data/log/system_debug.log")
+
+    def _restart_values(self) -> Dict[str, Optional[str]]:
+        return {f"{section}.{option}": self.ini.get(section, option) for section, option in RESTART_REQUIRED}
+
+    def restart_pending(self) -> List[str]:
+        # Geänderte Werte, die erst nach einem Neustart wirksam werden
+        current = self._restart_values()
+        return [key for key, value in current.items() if value != self._startup_values[key]]
+
+    def on_reload(self, callback: Callable[[], None]):
+        self._listeners.append(callback)
+
+    def reload_if_changed(self) -> bool:
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        try:
+            self.ini.reload()
+            self._build()
+        except Exception as e:
+            self.logger.error("Konfiguration konnte nicht neu geladen werden: %s", e)
+            return False
+        self.logger.info("Konfiguration neu geladen")
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                self.logger.error("Konfiguration konnte nicht angewendet werden: %s", e)
+        pending = self.restart_pending()
+        if pending:
+            self.logger.warning("Erst nach einem Neustart wirksam: %s", ", ".join(pending))
+        return True
+
+    def set_many(self, updates: Dict[str, Dict[str, str]]):
+        self.ini.set_many(updates)
+        self.reload_if_changed()
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="BotConfig-reload")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        # Ein stat() pro Intervall statt einer Dateiprüfung bei jedem Zugriff
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            self.reload_if_changed()
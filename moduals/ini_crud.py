@@ -1,6 +1,9 @@
 import configparser
+import io
 import os
-from typing import Optional
+from pathlib import Path
+from typing import Dict, Optional
+from moduals.file_utils import atomic_write
 
 class INIManager:
     def __init__(self, file_path: str):
@@ -10,7 +13,10 @@ class INIManager:
 
     def reload(self):
         if os.path.exists(self.file_path):
-            self.config.read(self.file_path)
+            # Neuer Parser, damit entfernte Optionen nicht aus dem alten Stand übrig bleiben
+            config = configparser.ConfigParser()
+            config.read(self.file_path, encoding="utf-8")
+            self.config = config
         else:
             open(self.file_path, 'w').close()
 
@@ -20,13 +26,21 @@ class INIManager:
     def get_int(self, section: str, option: str, fallback: Optional[int] = None) -> Optional[int]:
         return self.config.getint(section, option, fallback=fallback)
 
+    def get_float(self, section: str, option: str, fallback: Optional[float] = None) -> Optional[float]:
+        return self.config.getfloat(section, option, fallback=fallback)
+
     def get_bool(self, section: str, option: str, fallback: Optional[bool] = None) -> Optional[bool]:
         return self.config.getboolean(section, option, fallback=fallback)
 
     def set(self, section: str, option: str, value: str):
-        if not self.config.has_section(section):
-            self.config.add_section(section)
-        self.config.set(section, option, value)
+        self.set_many({section: {option: value}})
+
+    def set_many(self, updates: Dict[str, Dict[str, str]]):
+        for section, options in updates.items():
+            if not self.config.has_section(section):
+                self.config.add_section(section)
+            for option, value in options.items():
+                self.config.set(section, option, str(value))
         self.save()
 
     def remove_option(self, section: str, option: str):
@@ -40,5 +54,6 @@ class INIManager:
             self.save()
 
     def save(self):
-        with open(self.file_path, "w") as f:
-            self.config.write(f)
+        buf = io.StringIO()
+        self.config.write(buf)
+        atomic_write(Path(self.file_path), buf.getvalue().encode("utf-8"))
@@ -0,0 +1,153 @@
+import math
+import time
+import heapq
+import asyncio
+import orjson
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from moduals.file_utils import atomic_write
+
+
+class LockManager:
+    def __init__(self, path: Path, save_delay: float = 2.0, sweep_interval: float = 60.0):
+        self.path = path
+        self.save_delay = save_delay
+        self.sweep_interval = sweep_interval
+        self.locks: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._dirty = False
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.load()
+
+    @staticmethod
+    def _parse(raw: dict) -> Dict[str, float]:
+        # Fehlerhafte Einträge einzeln verwerfen, statt die ganze Datei zu verlieren
+        locks = {}
+        for user_id, expiry in raw.items():
+            try:
+                value = float(expiry)
+            except (TypeError, ValueError):
+                value = math.nan
+            if not math.isfinite(value):
+                print(f"[ERROR] load(): ungültiger Lock für {user_id} übersprungen: {expiry!r}")
+                continue
+            locks[str(user_id)] = value
+        return locks
+
+    def load(self) -> bool:
+        try:
+            if self.path.exists() and self.path.stat().st_size:
+                self.locks = self._parse(orjson.loads(self.path.read_bytes()))
+            else:
+                self.locks = {}
+            self._heap = [(expiry, user_id) for user_id, expiry in self.locks.items()]
+            heapq.heapify(self._heap)
+            self.purge_expired()
+            return True
+        except Exception as e:
+            print(f"[ERROR] load(): {e}")
+            return False
+
+    def save(self) -> bool:
+        try:
+            self._dirty = False
+            atomic_write(self.path, orjson.dumps(self.locks, option=orjson.OPT_INDENT_2))
+            return True
+        except Exception as e:
+            self._dirty = True
+            print(f"[ERROR] save(): {e}")
+            return False
+
+    def snapshot(self) -> bytes:
+        return orjson.dumps(self.locks)
+
+    def restore(self, payload: bytes):
+        self.locks = self._parse(orjson.loads(payload))
+        self._heap = [(expiry, user_id) for user_id, expiry in self.locks.items()]
+        heapq.heapify(self._heap)
+        self.purge_expired()
+        self._mark_dirty()
+
+    def remaining(self, user_id: str) -> Optional[float]:
+        expiry = self.locks.get(str(user_id))
+        if expiry is None:
+            return None
+        left = expiry - time.time()
+        return left if left > 0 else None
+
+    def add_lock(self, user_id: str, seconds: float) -> float:
+        if not math.isfinite(seconds):
+            raise ValueError("Die Dauer muss endlich sein")
+        expiry = time.time() + seconds
+        self.locks[str(user_id)] = expiry
+        heapq.heappush(self._heap, (expiry, str(user_id)))
+        self._mark_dirty()
+        return expiry
+
+    def remove_lock(self, user_id: str) -> bool:
+        # Der Heap-Eintrag bleibt liegen und wird beim Sweepen verworfen
+        if self.locks.pop(str(user_id), None) is None:
+            return False
+        self._mark_dirty()
+        return True
+
+    def list_locks(self) -> List[Tuple[str, float]]:
+        now = time.time()
+        return sorted(
+            ((user_id, expiry) for user_id, expiry in self.locks.items() if expiry > now),
+            key=lambda item: item[1]
+        )
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        removed = 0
+        while self._heap and self._heap[0][0] <= now:
+            expiry, user_id = heapq.heappop(self._heap)
+            if self.locks.get(user_id) == expiry:
+                del self.locks[user_id]
+                removed += 1
+        if removed:
+            self._mark_dirty()
+        return removed
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _next_timeout(self) -> float:
+        if not self._heap:
+            return self.sweep_interval
+        return max(0.0, min(self.sweep_interval, self._heap[0][0] - time.time()))
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="LockManager-sweeper")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._dirty:
+            await asyncio.to_thread(self.save)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._next_timeout())
+                # Änderungen kurz sammeln, damit mehrere Locks in einem Schreibvorgang landen
+                await asyncio.sleep(self.save_delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            self.purge_expired()
+            if self._dirty:
+                self._wakeup.clear()
+                await asyncio.to_thread(self.save)
@@ -1,11 +1,85 @@
+import copy
+import atexit
 import logging
 import os
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+
+class SizeTimeRotatingFileHandler(RotatingFileHandler):
+    # Rotiert, sobald die Datei max_bytes erreicht oder rotate_interval Sekunden alt ist
+    def __init__(self, filename: str, max_bytes: int, backup_count: int, rotate_interval: float):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.rotate_interval = rotate_interval
+        started = os.path.getmtime(filename) if os.path.exists(filename) else time.time()
+        self.rollover_at = started + rotate_interval
+
+    def shouldRollover(self, record) -> bool:
+        if self.rotate_interval and time.time() >= self.rollover_at:
+            if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+                return True
+            self.rollover_at = time.time() + self.rotate_interval
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time.time() + self.rotate_interval
+
+
+class SamplingFilter(logging.Filter):
+    # Lässt von DEBUG-Zeilen je Logger nur jede n-te durch, höhere Level immer
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.counters: Dict[str, int] = {}
+        self.set_rates(rates)
+
+    def set_rates(self, rates: Dict[str, float]):
+        self.every = {name: max(1, round(1 / rate)) if rate > 0 else 0 for name, rate in rates.items()}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        every = self.every.get(record.name)
+        if every is None:
+            return True
+        if every == 0:
+            return False
+        count = self.counters.get(record.name, 0)
+        self.counters[record.name] = count + 1
+        return count % every == 0
+
+
+class _DeferredQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Nachricht und Traceback jetzt festhalten, da sich Argumente bis zum Listener noch ändern
+        # können; Zeitstempel und Layout formatiert erst der Listener-Thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
 
 class LoggingManager:
-    def __init__(self, log_file: str = "logfile.log", level: int = logging.DEBUG):
+    def __init__(
+        self,
+        log_file: str = "logfile.log",
+        level: int = logging.DEBUG,
+        use_queue: bool = True,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 7,
+        rotate_interval: float = 86400.0,
+        sample_rates: Optional[Dict[str, float]] = None,
+    ):
         self.logger = logging.getLogger("SystemLogger")
         self.logger.setLevel(level)
         self.logger.propagate = False
+        self.listener: Optional[QueueListener] = None
+        self.sampler: Optional[SamplingFilter] = None
 
         if not self.logger.handlers:
             # Console Handler
@@ -16,14 +90,38 @@ class LoggingManager:
             ))
 
             # File Handler
-            file_handler = logging.FileHandler(log_file)
+            os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+            file_handler = SizeTimeRotatingFileHandler(log_file, max_bytes, backup_count, rotate_interval)
             file_handler.setLevel(level)
             file_handler.setFormatter(logging.Formatter(
                 "[%(asctime)s] [%(levelname)s] %(message)s", "%Y-%m-%d %H:%M:%S"
             ))
 
-            self.logger.addHandler(console_handler)
-            self.logger.addHandler(file_handler)
+            # Immer vorhanden, damit Stichprobenraten auch nachträglich gesetzt werden können
+            sampler = self.sampler = SamplingFilter(sample_rates or {})
+            if use_queue:
+                # Datei- und Konsolenausgabe laufen in einem Hintergrund-Thread
+                log_queue: queue.SimpleQueue = queue.SimpleQueue()
+                queue_handler = _DeferredQueueHandler(log_queue)
+                queue_handler.setLevel(level)
+                queue_handler.addFilter(sampler)
+                self.logger.addHandler(queue_handler)
+                self.listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+                self.listener.start()
+                atexit.register(self.stop)
+            else:
+                for handler in (console_handler, file_handler):
+                    handler.addFilter(sampler)
+                    self.logger.addHandler(handler)
 
     def get_logger(self):
         return self.logger
+
+    def set_sample_rates(self, rates: Dict[str, float]):
+        if self.sampler is not None:
+            self.sampler.set_rates(rates)
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
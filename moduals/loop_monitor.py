@@ -0,0 +1,90 @@
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from typing import Optional
+from moduals.metrics_crud import Metrics, metrics as default_metrics
+
+
+class LoopMonitor:
+    def __init__(
+        self,
+        interval: float = 0.25,
+        threshold: float = 0.5,
+        metrics: Optional[Metrics] = None,
+        stack_depth: int = 15,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.metrics = metrics or default_metrics
+        self.stack_depth = stack_depth
+        self.logger = logging.getLogger("SystemLogger")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._last_beat = 0.0
+        self._stall_reported = False
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat(), name="LoopMonitor")
+        self._watchdog = threading.Thread(target=self._watch, name="LoopMonitor-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _heartbeat(self):
+        # Wie viel später als geplant wacht der Loop auf? Das ist die Zeit, die andere Callbacks blockiert haben
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._last_beat = now
+            self.metrics.observe("event_loop_lag_seconds", lag)
+            self.metrics.set_gauge("event_loop_lag_last_seconds", lag)
+            if lag > self.threshold:
+                self.logger.warning("Event-Loop war %.0f ms blockiert", lag * 1000)
+            self._stall_reported = False
+
+    def _watch(self):
+        # Läuft in eigenem Thread, damit ein blockierter Loop trotzdem bemerkt wird
+        while not self._stopped.wait(self.interval):
+            stalled = time.monotonic() - self._last_beat - self.interval
+            if stalled > self.threshold and not self._stall_reported:
+                self._stall_reported = True
+                self._report_stall(stalled)
+
+    def _report_stall(self, stalled: float):
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame)[-self.stack_depth:])
+        task = asyncio.current_task(self._loop)
+        where = f"{task.get_name()} ({task.get_coro().__qualname__})" if task else "kein Task (Callback)"
+        self.logger.warning(
+            "Event-Loop seit %.0f ms blockiert in %s, Stack des Loop-Threads:\n%s",
+            stalled * 1000, where, stack,
+        )
+        # Metriken werden nur aus dem Loop-Thread verändert
+        self._loop.call_soon_threadsafe(self.metrics.inc, "event_loop_stalls_total")
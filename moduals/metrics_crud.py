@@ -0,0 +1,227 @@
+import re
+import time
+import bisect
+import functools
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+import aiohttp
+from aiohttp import web
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Wartezeit auf Nutzereingaben innerhalb des aktuell laufenden Timers
+_excluded: ContextVar[Optional[List[float]]] = ContextVar("metrics_excluded", default=None)
+
+
+class Histogram:
+    # Obergrenzen in Sekunden, wie bei Prometheus kumulativ ausgegeben
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    def __init__(self, prefix: str = "persobot"):
+        self.prefix = prefix
+        self.started = time.time()
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.gauges: Dict[str, Dict[LabelKey, float]] = {}
+
+    @staticmethod
+    def _key(labels: Dict[str, object]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def observe(self, name: str, value: float, **labels):
+        series = self.histograms.setdefault(name, {})
+        key = self._key(labels)
+        hist = series.get(key)
+        if hist is None:
+            hist = series[key] = Histogram()
+        hist.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        series = self.counters.setdefault(name, {})
+        key = self._key(labels)
+        series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        self.gauges.setdefault(name, {})[self._key(labels)] = value
+
+    @contextmanager
+    def time(self, name: str, **labels):
+        started = time.perf_counter()
+        excluded = [0.0]
+        token = _excluded.set(excluded)
+        try:
+            yield
+        except Exception:
+            self.inc(f"{name}_errors_total", **labels)
+            raise
+        finally:
+            _excluded.reset(token)
+            self.observe(f"{name}_seconds", time.perf_counter() - started - excluded[0], **labels)
+
+    @contextmanager
+    def waiting(self, kind: str):
+        # Auf Nutzer warten (Views, Modals) ist keine Bearbeitungszeit: eigene Zeitreihe,
+        # die vom umgebenden Timer abgezogen wird
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            waited = time.perf_counter() - started
+            self.observe("user_wait_seconds", waited, kind=kind)
+            excluded = _excluded.get()
+            if excluded is not None:
+                excluded[0] += waited
+
+    def timed(self, name: str, **labels):
+        # Decorator für Coroutinen: App-Commands, View-Callbacks usw.
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with self.time(name, **labels):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _labels(key: LabelKey, le: Optional[str] = None) -> str:
+        pairs = list(key) + ([("le", le)] if le is not None else [])
+        if not pairs:
+            return ""
+        escaped = ('%s="%s"' % (k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+        return "{" + ",".join(escaped) + "}"
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        for name, series in sorted(self.counters.items()):
+            full = f"{self.prefix}_{name}"
+            lines.append(f"# TYPE {full} counter")
+            lines.extend(f"{full}{self._labels(key)} {value}" for key, value in series.items())
+        for name, series in sorted(self.gauges.items()):
+            full = f"{self.prefix}_{name}"
+            lines.append(f"# TYPE {full} gauge")
+            lines.extend(f"{full}{self._labels(key)} {value}" for key, value in series.items())
+        for name, series in sorted(self.histograms.items()):
+            full = f"{self.prefix}_{name}"
+            lines.append(f"# TYPE {full} histogram")
+            for key, hist in series.items():
+                cumulative = 0
+                for bound, n in zip(Histogram.BUCKETS, hist.counts):
+                    cumulative += n
+                    lines.append(f"{full}_bucket{self._labels(key, str(bound))} {cumulative}")
+                lines.append(f"{full}_bucket{self._labels(key, '+Inf')} {hist.count}")
+                lines.append(f"{full}_sum{self._labels(key)} {hist.sum}")
+                lines.append(f"{full}_count{self._labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, limit: int = 15) -> List[dict]:
+        # Die teuersten Zeitreihen nach Gesamtzeit, für $stats
+        rows = []
+        uptime = max(time.time() - self.started, 1.0)
+        for name, series in self.histograms.items():
+            # Wartezeiten auf Nutzer sind keine Hot Spots, sie stehen nur unter /metrics
+            if name == "user_wait_seconds":
+                continue
+            for key, hist in series.items():
+                rows.append({
+                    "name": name.removesuffix("_seconds"),
+                    "labels": ",".join(v for _, v in key),
+                    "count": hist.count,
+                    "rate": hist.count / uptime,
+                    "avg_ms": hist.sum / hist.count * 1000 if hist.count else 0.0,
+                    "p95_ms": (hist.percentile(0.95) or 0.0) * 1000,
+                    "max_ms": hist.max * 1000,
+                    "total": hist.sum,
+                })
+        rows.sort(key=lambda row: row["total"], reverse=True)
+        return rows[:limit]
+
+
+# Snowflakes und Webhook-/Interaction-Tokens würden pro Aufruf eine neue Zeitreihe erzeugen
+_ID_SEGMENT = re.compile(r"/\d{15,}")
+_TOKEN_SEGMENT = re.compile(r"/[\w-]{40,}")
+
+
+def _route(url) -> str:
+    path = _TOKEN_SEGMENT.sub("/:token", _ID_SEGMENT.sub("/:id", url.path))
+    return f"{url.host}{path}"
+
+
+def http_trace_config(metrics: Metrics, name: str = "http_request") -> aiohttp.TraceConfig:
+    # Misst jede Anfrage einer aiohttp-Session, auch die REST-Aufrufe von discord.py
+    async def on_start(session, ctx, params):
+        ctx.started = time.perf_counter()
+
+    async def on_end(session, ctx, params):
+        route = _route(params.url)
+        metrics.observe(f"{name}_seconds", time.perf_counter() - ctx.started, method=params.method, route=route)
+        metrics.inc(f"{name}_total", method=params.method, route=route, status=params.response.status)
+
+    async def on_exception(session, ctx, params):
+        route = _route(params.url)
+        metrics.observe(f"{name}_seconds", time.perf_counter() - ctx.started, method=params.method, route=route)
+        metrics.inc(f"{name}_errors_total", method=params.method, route=route)
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(on_start)
+    trace.on_request_end.append(on_end)
+    trace.on_request_exception.append(on_exception)
+    return trace
+
+
+class MetricsServer:
+    def __init__(self, metrics: Metrics, host: str = "127.0.0.1", port: int = 9108):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.logger = logging.getLogger("SystemLogger")
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.metrics.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    async def start(self):
+        if self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.logger.info("Metriken unter http://%s:%s/metrics erreichbar", self.host, self.port)
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+# Prozessweite Registry, wie logging.getLogger für Logs
+metrics = Metrics()
@@ -1,9 +1,14 @@
-import os
-import json
+import gzip
 import uuid
+import asyncio
+import functools
+import orjson
 from pathlib import Path
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timezone
+from moduals.metrics_crud import metrics
+from moduals.perso_storage import StorageBackend, JsonFileBackend, SQLiteBackend, migrate_json_to_sqlite
 
 class Person:
     def __init__(
@@ -57,40 +62,38 @@ class Person:
 
 
 class PersonenDB:
-    def __init__(self, base_path: Path):
-        self.path = base_path / "personen.json"
-        self.data: Dict[str, List[Dict]] = {}
-        if self.path.exists():
-            self.load()
+    def __init__(self, base_path: Path, backend: str = "json", **options):
+        json_path = base_path / "personen.json"
+        if backend == "sqlite":
+            sqlite_path = base_path / "personen.db"
+            # Einmalige Migration beim ersten Start mit SQLite
+            if not sqlite_path.exists() and json_path.exists():
+                migrated = migrate_json_to_sqlite(json_path, sqlite_path)
+                print(f"[INFO] {migrated} Ausweise aus {json_path} nach {sqlite_path} migriert")
+            self.backend: StorageBackend = SQLiteBackend(sqlite_path)
+        elif backend == "json":
+            self.backend = JsonFileBackend(json_path, **options)
         else:
-            self.data = {}
-            self.save()
+            raise ValueError(f"Unbekanntes Storage-Backend: {backend}")
 
-    def load(self) -> bool:
+    def flush(self) -> bool:
         try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                self.data = json.load(f)
-            return True
+            return self.backend.flush()
         except Exception as e:
-            print(f"[ERROR] load(): {e}")
+            print(f"[ERROR] flush(): {e}")
             return False
 
-    def save(self) -> bool:
+    def close(self):
         try:
-            with open(self.path, "w", encoding="utf-8") as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
-            return True
+            self.backend.close()
         except Exception as e:
-            print(f"[ERROR] save(): {e}")
-            return False
+            print(f"[ERROR] close(): {e}")
 
     def add_perso(self, discord_id: str, person: Person) -> any:
         try:
-            if discord_id not in self.data:
-                self.data[discord_id] = []
-            self.data[discord_id].append(person.to_dict())
+            if not self.backend.add(discord_id, person.to_dict()):
+                return False
             uuid=str(person.uuid)
-            self.save()
             return uuid
         except Exception as e:
             print(f"[ERROR] add_perso(): {e}")
@@ -98,42 +101,157 @@ class PersonenDB:
 
     def delete_perso(self, discord_id: str, uuid_str: str) -> bool:
         try:
-            if discord_id in self.data:
-                self.data[discord_id] = [
-                    p for p in self.data[discord_id] if p["uuid"] != uuid_str
-                ]
-                return self.save()
-            return False
+            return self.backend.delete(discord_id, uuid_str)
         except Exception as e:
             print(f"[ERROR] delete_perso(): {e}")
             return False
 
     def update_perso(self, discord_id: str, uuid_str: str, new_data: Dict) -> bool:
         try:
-            if discord_id not in self.data:
-                return False
-            for i, p in enumerate(self.data[discord_id]):
-                if p["uuid"] == uuid_str:
-                    self.data[discord_id][i].update(new_data)
-                    return self.save()
-            return False
+            return self.backend.update(discord_id, uuid_str, new_data)
         except Exception as e:
             print(f"[ERROR] update_perso(): {e}")
             return False
 
+    def delete_perso_by_uuid(self, uuid_str: str) -> bool:
+        owner = self.get_discordid_by_uuid(uuid_str)
+        if owner is None:
+            return False
+        return self.delete_perso(owner, uuid_str)
+
+    def update_perso_by_uuid(self, uuid_str: str, new_data: Dict) -> bool:
+        owner = self.get_discordid_by_uuid(uuid_str)
+        if owner is None:
+            return False
+        return self.update_perso(owner, uuid_str, new_data)
+
     def get_perso_by_uuid(self, uuid_str: str) -> Optional[Dict]:
         try:
-            for persons in self.data.values():
-                for p in persons:
-                    if p["uuid"] == uuid_str:
-                        return p
-            return None
+            return self.backend.get_by_uuid(uuid_str)
         except Exception as e:
             print(f"[ERROR] get_perso_by_uuid(): {e}")
             return None
 
+    def get_discordid_by_uuid(self, uuid_str: str) -> Optional[str]:
+        try:
+            return self.backend.get_owner(uuid_str)
+        except Exception as e:
+            print(f"[ERROR] get_discordid_by_uuid(): {e}")
+            return None
+
+    def get_persos_by_discordid(self, discord_id: str) -> List[Dict]:
+        return self.backend.get_by_discordid(discord_id)
+
+    def count_persos(self, discord_id: str) -> int:
+        return self.backend.count(discord_id)
+
+    def export_ndjson_gz(self, path: Path) -> int:
+        count = 0
+        with gzip.open(path, "wb", compresslevel=6) as f:
+            for discord_id, record in self.backend.iter_all():
+                f.write(orjson.dumps({"discord_id": discord_id, "perso": record}) + b"\n")
+                count += 1
+        return count
+
+    def read_ndjson_gz(self, path: Path, chunk_size: int = 500) -> Iterator[Tuple[List[Tuple[str, Dict]], int]]:
+        # Liefert Blöcke gültiger Datensätze und die Zahl verworfener Zeilen je Block
+        chunk, invalid = [], 0
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = orjson.loads(line)
+                    chunk.append((str(int(entry["discord_id"])), Person.from_dict(entry["perso"]).to_dict()))
+                except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+                    invalid += 1
+                if len(chunk) >= chunk_size:
+                    yield chunk, invalid
+                    chunk, invalid = [], 0
+        if chunk or invalid:
+            yield chunk, invalid
+
+    def snapshot(self) -> bytes:
+        return self.backend.snapshot()
+
+    def restore(self, payload: bytes) -> bool:
+        try:
+            return self.backend.restore(payload)
+        except Exception as e:
+            print(f"[ERROR] restore(): {e}")
+            return False
+
+    def import_persos(self, items: List[Tuple[str, Dict]]) -> int:
+        try:
+            return self.backend.add_many(items)
+        except Exception as e:
+            print(f"[ERROR] import_persos(): {e}")
+            return 0
+
+
+class AsyncPersonenDB:
+    def __init__(self, db: PersonenDB):
+        self.db = db
+        # Ein einzelner Worker-Thread hält die Reihenfolge der Schreibzugriffe ein
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="PersonenDB")
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Gemessen wird inklusive Wartezeit auf den Worker, so sieht man auch Rückstau
+        with metrics.time("db_op", op=func.__name__):
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def add_perso(self, discord_id: str, person: Person) -> any:
+        return await self._run(self.db.add_perso, discord_id, person)
+
+    async def delete_perso(self, discord_id: str, uuid_str: str) -> bool:
+        return await self._run(self.db.delete_perso, discord_id, uuid_str)
+
+    async def update_perso(self, discord_id: str, uuid_str: str, new_data: Dict) -> bool:
+        return await self._run(self.db.update_perso, discord_id, uuid_str, dict(new_data))
+
+    async def delete_perso_by_uuid(self, uuid_str: str) -> bool:
+        return await self._run(self.db.delete_perso_by_uuid, uuid_str)
+
+    async def update_perso_by_uuid(self, uuid_str: str, new_data: Dict) -> bool:
+        return await self._run(self.db.update_perso_by_uuid, uuid_str, dict(new_data))
+
+    async def flush(self) -> bool:
+        return await self._run(self.db.flush)
+
+    async def restore(self, payload: bytes) -> bool:
+        return await self._run(self.db.restore, payload)
+
+    async def export_ndjson_gz(self, path: Path) -> int:
+        # Läuft außerhalb des Schreib-Workers, normale Schreibzugriffe warten nicht auf den Export
+        return await asyncio.to_thread(self.db.export_ndjson_gz, path)
+
+    async def import_ndjson_gz(self, path: Path, chunk_size: int = 500) -> Dict[str, int]:
+        stats = {"imported": 0, "skipped": 0, "invalid": 0}
+        chunks = self.db.read_ndjson_gz(path, chunk_size)
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                return stats
+            items, invalid = chunk
+            # Jeder Block ist ein eigener Auftrag, dazwischen kommen reguläre Schreibzugriffe dran
+            imported = await self._run(self.db.import_persos, items)
+            stats["imported"] += imported
+            stats["skipped"] += len(items) - imported
+            stats["invalid"] += invalid
+
+    async def close(self):
+        await self._run(self.db.close)
+        self._executor.shutdown(wait=True)
+
+    def get_perso_by_uuid(self, uuid_str: str) -> Optional[Dict]:
+        return self.db.get_perso_by_uuid(uuid_str)
+
+    def get_discordid_by_uuid(self, uuid_str: str) -> Optional[str]:
+        return self.db.get_discordid_by_uuid(uuid_str)
+
     def get_persos_by_discordid(self, discord_id: str) -> List[Dict]:
-        return self.data.get(discord_id, [])
+        return self.db.get_persos_by_discordid(discord_id)
 
     def count_persos(self, discord_id: str) -> int:
-        return len(self.data.get(discord_id, []))
+        return self.db.count_persos(discord_id)
@@ -0,0 +1,554 @@
+import os
+import sys
+import mmap
+import atexit
+import shutil
+import sqlite3
+import tempfile
+import threading
+import orjson
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from moduals.file_utils import atomic_write
+
+
+def read_json_mmap(path: Path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return {}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+class StorageBackend:
+    def add(self, discord_id: str, record: Dict) -> bool:
+        raise NotImplementedError
+
+    def update(self, discord_id: str, uuid_str: str, new_data: Dict) -> bool:
+        raise NotImplementedError
+
+    def delete(self, discord_id: str, uuid_str: str) -> bool:
+        raise NotImplementedError
+
+    def get_by_uuid(self, uuid_str: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def get_owner(self, uuid_str: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def get_by_discordid(self, discord_id: str) -> List[Dict]:
+        raise NotImplementedError
+
+    def count(self, discord_id: str) -> int:
+        raise NotImplementedError
+
+    def iter_all(self) -> Iterator[Tuple[str, Dict]]:
+        raise NotImplementedError
+
+    def add_many(self, items: List[Tuple[str, Dict]]) -> int:
+        return sum(1 for discord_id, record in items if self.add(discord_id, record))
+
+    def snapshot(self) -> bytes:
+        raise NotImplementedError
+
+    def restore(self, payload: bytes) -> bool:
+        raise NotImplementedError
+
+    def flush(self) -> bool:
+        return True
+
+    def close(self):
+        self.flush()
+
+
+class JsonFileBackend(StorageBackend):
+    def __init__(
+        self,
+        path: Path,
+        write_behind: bool = False,
+        flush_interval: float = 2.0,
+        journal: bool = False,
+        compact_threshold: int = 4 * 1024 * 1024,
+        journal_fsync: bool = False,
+    ):
+        self.path = path
+        self.journal_path = path.with_suffix(".journal")
+        self.data: Dict[str, List[Dict]] = {}
+        self._index: Dict[str, Tuple[str, Dict]] = {}
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.journal = journal
+        self.compact_threshold = compact_threshold
+        self.journal_fsync = journal_fsync
+        self._lock = threading.RLock()
+        self._io_lock = threading.Lock()
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        self._generation = 0
+        self._written_generation = 0
+        self._journal_file = None
+        self._journal_size = 0
+        self._compacting = False
+        if self.path.exists():
+            self.load()
+        else:
+            self.data = {}
+            self.save()
+        if self.journal:
+            self._open_journal()
+            if self._old_journal_path.exists():
+                self.compact()
+        if self.write_behind or self.journal:
+            atexit.register(self.flush)
+
+    @property
+    def _old_journal_path(self) -> Path:
+        return self.journal_path.with_name(self.journal_path.name + ".old")
+
+    def load(self) -> bool:
+        try:
+            data = read_json_mmap(self.path)
+            with self._lock:
+                self.data = data
+                self._rebuild_index()
+                if self.journal:
+                    self._replay_journal(self._old_journal_path)
+                    self._replay_journal(self.journal_path)
+            return True
+        except Exception as e:
+            print(f"[ERROR] load(): {e}")
+            return False
+
+    def save(self) -> bool:
+        try:
+            with self._lock:
+                payload = orjson.dumps(self.data)
+                self._dirty = False
+                self._generation += 1
+                generation = self._generation
+            with self._io_lock:
+                # Ein neuerer Stand wurde bereits geschrieben
+                if generation <= self._written_generation:
+                    return True
+                atomic_write(self.path, payload)
+                self._written_generation = generation
+            return True
+        except Exception as e:
+            with self._lock:
+                self._dirty = True
+            print(f"[ERROR] save(): {e}")
+            return False
+
+    def flush(self) -> bool:
+        if self.journal:
+            with self._lock:
+                if self._journal_file is not None:
+                    self._journal_file.flush()
+                    os.fsync(self._journal_file.fileno())
+            return True
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            dirty = self._dirty
+            generation = self._generation
+        if not dirty:
+            # Der Timer-Thread kann gerade schreiben: auf ihn warten, sonst endet der Prozess mitten im Schreiben
+            with self._io_lock:
+                if self._written_generation >= generation:
+                    return True
+        return self.save()
+
+    def compact(self) -> bool:
+        try:
+            with self._lock:
+                if self._journal_file is not None:
+                    self._journal_file.close()
+                    self._journal_file = None
+                self._rotate_journal()
+                self._open_journal()
+            if not self.save():
+                return False
+            if self._old_journal_path.exists():
+                os.remove(self._old_journal_path)
+            return True
+        except Exception as e:
+            print(f"[ERROR] compact(): {e}")
+            return False
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def _rotate_journal(self):
+        if not self.journal_path.exists():
+            return
+        if not self._old_journal_path.exists():
+            os.replace(self.journal_path, self._old_journal_path)
+            return
+        # Eine vorherige Kompaktierung ist fehlgeschlagen: Journal an .old anhängen
+        with open(self._old_journal_path, "ab") as dst, open(self.journal_path, "rb") as src:
+            shutil.copyfileobj(src, dst)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.remove(self.journal_path)
+
+    def _open_journal(self):
+        self._journal_file = open(self.journal_path, "ab")
+        self._journal_size = self._journal_file.tell()
+
+    def _replay_journal(self, path: Path):
+        if not path.exists():
+            return
+        good_offset = 0
+        with open(path, "rb") as f:
+            for line in f:
+                # Ein abgeschnittener letzter Eintrag (Absturz beim Schreiben) wird verworfen
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    break
+                self._apply(entry)
+                good_offset += len(line)
+        if good_offset < path.stat().st_size:
+            print(f"[WARN] Journal {path} ab Byte {good_offset} abgeschnitten")
+            with open(path, "r+b") as f:
+                f.truncate(good_offset)
+
+    def _rebuild_index(self):
+        self._index = {
+            p["uuid"]: (discord_id, p)
+            for discord_id, persons in self.data.items()
+            for p in persons
+        }
+
+    def _apply(self, entry: Dict) -> bool:
+        op = entry["op"]
+        discord_id = entry["id"]
+        if op == "add":
+            record = entry["rec"]
+            if record["uuid"] in self._index:
+                return False
+            self.data.setdefault(discord_id, []).append(record)
+            self._index[record["uuid"]] = (discord_id, record)
+            return True
+
+        owner, record = self._index.get(entry["uuid"], (None, None))
+        if record is None or owner != discord_id:
+            return False
+        if op == "update":
+            record.update(entry["rec"])
+            if record["uuid"] != entry["uuid"]:
+                del self._index[entry["uuid"]]
+                self._index[record["uuid"]] = (owner, record)
+            return True
+        if op == "delete":
+            del self._index[entry["uuid"]]
+            self.data[owner] = [p for p in self.data[owner] if p is not record]
+            return True
+        return False
+
+    def _commit(self, entry: Dict) -> bool:
+        if self.journal:
+            return self._append_journal(entry)
+        if not self.write_behind:
+            return self.save()
+        self._schedule_flush()
+        return True
+
+    def _schedule_flush(self):
+        with self._lock:
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _append_journal(self, entry: Dict) -> bool:
+        line = orjson.dumps(entry) + b"\n"
+        with self._lock:
+            self._journal_file.write(line)
+            self._journal_file.flush()
+            if self.journal_fsync:
+                os.fsync(self._journal_file.fileno())
+            self._journal_size += len(line)
+            if self._journal_size >= self.compact_threshold and not self._compacting:
+                self._compacting = True
+                threading.Thread(target=self.compact, name="PersonenDB-compact", daemon=True).start()
+        return True
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._timer = None
+        if self.save():
+            return
+        # Schreiben fehlgeschlagen: erneut einplanen, die Daten bleiben dirty
+        self._schedule_flush()
+
+    def _mutate(self, entry: Dict) -> bool:
+        with self._lock:
+            if not self._apply(entry):
+                return False
+            return self._commit(entry)
+
+    def add(self, discord_id: str, record: Dict) -> bool:
+        return self._mutate({"op": "add", "id": discord_id, "rec": record})
+
+    def update(self, discord_id: str, uuid_str: str, new_data: Dict) -> bool:
+        return self._mutate({"op": "update", "id": discord_id, "uuid": uuid_str, "rec": dict(new_data)})
+
+    def delete(self, discord_id: str, uuid_str: str) -> bool:
+        return self._mutate({"op": "delete", "id": discord_id, "uuid": uuid_str})
+
+    def get_by_uuid(self, uuid_str: str) -> Optional[Dict]:
+        entry = self._index.get(uuid_str)
+        return entry[1] if entry else None
+
+    def get_owner(self, uuid_str: str) -> Optional[str]:
+        entry = self._index.get(uuid_str)
+        return entry[0] if entry else None
+
+    def get_by_discordid(self, discord_id: str) -> List[Dict]:
+        return self.data.get(discord_id, [])
+
+    def count(self, discord_id: str) -> int:
+        return len(self.data.get(discord_id, []))
+
+    def iter_all(self) -> Iterator[Tuple[str, Dict]]:
+        # Flache Kopie unter dem Lock, damit gleichzeitige Schreibzugriffe den Export nicht verändern
+        with self._lock:
+            snapshot = [(discord_id, dict(p)) for discord_id, persons in self.data.items() for p in persons]
+        return iter(snapshot)
+
+    def snapshot(self) -> bytes:
+        with self._lock:
+            return orjson.dumps(self.data)
+
+    def restore(self, payload: bytes) -> bool:
+        try:
+            data = orjson.loads(payload)
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                # Erst die Datei ersetzen, dann das Journal leeren: sonst bliebe nach einem
+                # Absturz dazwischen der alte Stand ohne seine Journal-Einträge zurück
+                with self._io_lock:
+                    atomic_write(self.path, payload)
+                    self._generation += 1
+                    self._written_generation = self._generation
+                self._dirty = False
+                self.data = data
+                self._rebuild_index()
+                if self.journal:
+                    # Journal-Einträge beziehen sich auf den alten Stand und dürfen nicht erneut angewendet werden
+                    self._journal_file.truncate(0)
+                    self._journal_size = 0
+                    if self._old_journal_path.exists():
+                        os.remove(self._old_journal_path)
+            return True
+        except Exception as e:
+            print(f"[ERROR] restore(): {e}")
+            return False
+
+    def add_many(self, items: List[Tuple[str, Dict]]) -> int:
+        with self._lock:
+            applied = [entry for entry in ({"op": "add", "id": d, "rec": r} for d, r in items) if self._apply(entry)]
+            if not applied:
+                return 0
+            # Ein Schreibvorgang für den ganzen Block statt einem pro Datensatz
+            if self.journal:
+                for entry in applied:
+                    self._append_journal(entry)
+            elif self.write_behind:
+                self._schedule_flush()
+            else:
+                self.save()
+            return len(applied)
+
+
+class SQLiteBackend(StorageBackend):
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS personen (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                uuid TEXT NOT NULL,
+                discord_id TEXT NOT NULL,
+                status TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_personen_uuid ON personen (uuid);
+            CREATE INDEX IF NOT EXISTS idx_personen_discord_id ON personen (discord_id);
+            CREATE INDEX IF NOT EXISTS idx_personen_status ON personen (status);
+            """
+        )
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+    def _reader(self) -> sqlite3.Connection:
+        # Lesezugriffe nutzen je Thread eine eigene Verbindung ohne den Schreib-Lock,
+        # im WAL-Modus warten sie so weder auf Imports noch auf Backups
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA query_only=1")
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def add(self, discord_id: str, record: Dict) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO personen (uuid, discord_id, status, data) VALUES (?, ?, ?, ?)",
+                (record["uuid"], discord_id, record.get("status"), orjson.dumps(record).decode("utf-8")),
+            )
+            return cur.rowcount == 1
+
+    def add_many(self, items: List[Tuple[str, Dict]]) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                cur = self._conn.executemany(
+                    "INSERT OR IGNORE INTO personen (uuid, discord_id, status, data) VALUES (?, ?, ?, ?)",
+                    [
+                        (record["uuid"], discord_id, record.get("status"), orjson.dumps(record).decode("utf-8"))
+                        for discord_id, record in items
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return cur.rowcount
+
+    def update(self, discord_id: str, uuid_str: str, new_data: Dict) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM personen WHERE uuid = ? AND discord_id = ?", (uuid_str, discord_id)
+            ).fetchone()
+            if row is None:
+                return False
+            record = orjson.loads(row[0])
+            record.update(new_data)
+            self._conn.execute(
+                "UPDATE personen SET uuid = ?, status = ?, data = ? WHERE uuid = ?",
+                (record["uuid"], record.get("status"), orjson.dumps(record).decode("utf-8"), uuid_str),
+            )
+            return True
+
+    def delete(self, discord_id: str, uuid_str: str) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM personen WHERE uuid = ? AND discord_id = ?", (uuid_str, discord_id)
+            )
+            return cur.rowcount == 1
+
+    def get_by_uuid(self, uuid_str: str) -> Optional[Dict]:
+        row = self._reader().execute("SELECT data FROM personen WHERE uuid = ?", (uuid_str,)).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def get_owner(self, uuid_str: str) -> Optional[str]:
+        row = self._reader().execute("SELECT discord_id FROM personen WHERE uuid = ?", (uuid_str,)).fetchone()
+        return row[0] if row else None
+
+    def get_by_discordid(self, discord_id: str) -> List[Dict]:
+        rows = self._reader().execute(
+            "SELECT data FROM personen WHERE discord_id = ? ORDER BY id", (discord_id,)
+        ).fetchall()
+        return [orjson.loads(row[0]) for row in rows]
+
+    def count(self, discord_id: str) -> int:
+        row = self._reader().execute("SELECT COUNT(*) FROM personen WHERE discord_id = ?", (discord_id,)).fetchone()
+        return row[0]
+
+    def snapshot(self) -> bytes:
+        # Die Backup-API liefert einen konsistenten Stand inklusive WAL-Inhalt
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.path.parent), prefix=f".{self.path.name}.", suffix=".snap")
+        os.close(fd)
+        try:
+            dst = sqlite3.connect(tmp_path)
+            try:
+                with self._lock:
+                    self._conn.backup(dst)
+            finally:
+                dst.close()
+            return Path(tmp_path).read_bytes()
+        finally:
+            os.remove(tmp_path)
+
+    def restore(self, payload: bytes) -> bool:
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.path.parent), prefix=f".{self.path.name}.", suffix=".snap")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            src = sqlite3.connect(tmp_path)
+            try:
+                with self._lock:
+                    src.backup(self._conn)
+            finally:
+                src.close()
+            return True
+        finally:
+            os.remove(tmp_path)
+
+    def iter_all(self) -> Iterator[Tuple[str, Dict]]:
+        # Eigene Leseverbindung: im WAL-Modus blockiert der Export keine Schreibzugriffe
+        conn = sqlite3.connect(str(self.path))
+        try:
+            cur = conn.execute("SELECT discord_id, data FROM personen ORDER BY id")
+            while True:
+                rows = cur.fetchmany(1000)
+                if not rows:
+                    return
+                for discord_id, data in rows:
+                    yield discord_id, orjson.loads(data)
+        finally:
+            conn.close()
+
+    def close(self):
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_json_to_sqlite(json_path: Path, sqlite_path: Path) -> int:
+    data = read_json_mmap(json_path)
+    backend = SQLiteBackend(sqlite_path)
+    try:
+        return backend.add_many([
+            (discord_id, record)
+            for discord_id, persons in data.items()
+            for record in persons
+        ])
+    finally:
+        backend.close()
+
+
+def export_pretty(json_path: Path, target_path: Path):
+    atomic_write(target_path, orjson.dumps(read_json_mmap(json_path), option=orjson.OPT_INDENT_2))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("migrate", "pretty"):
+        print("Verwendung: python -m moduals.perso_storage migrate <personen.json> <personen.db>")
+        print("            python -m moduals.perso_storage pretty <personen.json> <ausgabe.json>")
+        sys.exit(1)
+    if sys.argv[1] == "migrate":
+        migrated = migrate_json_to_sqlite(Path(sys.argv[2]), Path(sys.argv[3]))
+        print(f"{migrated} Ausweise nach {sys.argv[3]} migriert")
+    else:
+        export_pretty(Path(sys.argv[2]), Path(sys.argv[3]))
+        print(f"{sys.argv[2]} lesbar nach {sys.argv[3]} exportiert")
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import aiohttp
+import orjson
+from collections import deque
+from pathlib import Path
+from typing import Deque, List, Optional
+
+
+class WebhookLogShipper:
+    def __init__(
+        self,
+        url: str,
+        buffer_path: Path,
+        max_length: int = 2000,
+        batch_delay: float = 1.0,
+        max_backoff: float = 300.0,
+    ):
+        self.url = url
+        self.buffer_path = buffer_path
+        self.max_length = max_length
+        self.batch_delay = batch_delay
+        self.max_backoff = max_backoff
+        self.logger = logging.getLogger("SystemLogger")
+        self._lines: Deque[str] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._owns_session = False
+        self._backoff = 0.0
+
+    def submit(self, content: str):
+        # Zu lange Einträge werden in Discord-taugliche Stücke geteilt
+        for i in range(0, max(len(content), 1), self.max_length):
+            self._lines.append(content[i:i + self.max_length])
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self, session: Optional[aiohttp.ClientSession] = None):
+        if self._task is not None:
+            return
+        if session is None:
+            session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+            self._owns_session = True
+        self._session = session
+        self._lines.extendleft(reversed(self._read_buffer()))
+        self._wakeup = asyncio.Event()
+        if self._lines:
+            self._wakeup.set()
+        self._task = asyncio.create_task(self._run(), name="WebhookLogShipper")
+
+    async def stop(self, timeout: float = 5.0):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await asyncio.wait_for(self._drain(), timeout=timeout)
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            pass
+        if self._lines:
+            self._spill()
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+        self._session = None
+
+    def _pack(self) -> List[str]:
+        batch = []
+        size = 0
+        while self._lines:
+            line = self._lines[0]
+            extra = len(line) + (1 if batch else 0)
+            if batch and size + extra > self.max_length:
+                break
+            batch.append(self._lines.popleft())
+            size += extra
+        return batch
+
+    async def _drain(self):
+        while self._lines:
+            batch = self._pack()
+            try:
+                sent = await self._post("\n".join(batch))
+            except (asyncio.CancelledError, aiohttp.ClientError, asyncio.TimeoutError):
+                # Abbruch durch das Timeout in stop(): der Block landet danach im Puffer
+                self._lines.extendleft(reversed(batch))
+                raise
+            if not sent:
+                self._lines.extendleft(reversed(batch))
+                return
+
+    async def _post(self, content: str) -> bool:
+        while True:
+            async with self._session.post(self.url, json={"content": content}) as response:
+                if response.status == 429:
+                    retry_after = response.headers.get("Retry-After", 1)
+                    try:
+                        retry_after = (await response.json()).get("retry_after", retry_after)
+                    except (aiohttp.ContentTypeError, ValueError):
+                        pass
+                    await asyncio.sleep(float(retry_after))
+                    continue
+                if response.status >= 400:
+                    self.logger.warning("Webhook-Log abgelehnt (HTTP %s)", response.status)
+                    return response.status < 500
+                return True
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            # Kurz warten, damit mehrere Einträge in einer Nachricht landen
+            await asyncio.sleep(self.batch_delay)
+            self._wakeup.clear()
+            while self._lines:
+                batch = self._pack()
+                try:
+                    sent = await self._post("\n".join(batch))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    self.logger.warning("Webhook nicht erreichbar: %s", e)
+                    sent = False
+                except asyncio.CancelledError:
+                    # stop() bricht mitten im Senden ab: unbestätigte Einträge zurücklegen
+                    self._lines.extendleft(reversed(batch))
+                    raise
+                except Exception:
+                    # Ein unerwarteter Fehler darf den Versand nicht dauerhaft beenden
+                    self.logger.exception("Webhook-Log konnte nicht gesendet werden")
+                    sent = False
+                if sent:
+                    self._backoff = 0.0
+                    continue
+                self._lines.extendleft(reversed(batch))
+                self._spill()
+                self._backoff = min(self.max_backoff, max(1.0, self._backoff * 2))
+                await asyncio.sleep(self._backoff)
+                self._lines.extendleft(reversed(self._read_buffer()))
+
+    def _spill(self):
+        try:
+            with open(self.buffer_path, "ab") as f:
+                f.write(b"".join(orjson.dumps(line) + b"\n" for line in self._lines))
+            self._lines.clear()
+        except OSError as e:
+            self.logger.error("Webhook-Puffer konnte nicht geschrieben werden: %s", e)
+
+    def _read_buffer(self) -> List[str]:
+        if not self.buffer_path.exists():
+            return []
+        lines = []
+        try:
+            with open(self.buffer_path, "rb") as f:
+                for raw in f:
+                    try:
+                        lines.append(orjson.loads(raw))
+                    except orjson.JSONDecodeError:
+                        continue
+            self.buffer_path.unlink()
+        except OSError as e:
+            # Der Puffer bleibt liegen und wird beim nächsten Versuch erneut gelesen
+            self.logger.error("Webhook-Puffer konnte nicht gelesen werden: %s", e)
+            return []
+        return lines
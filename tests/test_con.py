@@ -0,0 +1,537 @@
+import time
+import asyncio
+import pytest
+from moduals import con
+from moduals.con import AsyncDBClient, DBClientError
+from moduals.con_server import AsyncDBServer
+
+KEY = "test-key"
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def _sleep(data):
+    await asyncio.sleep(data[0])
+    return data[1]
+
+
+async def _server() -> AsyncDBServer:
+    server = AsyncDBServer("127.0.0.1", 0, KEY)
+    server.register("test", "items", lambda data: list(range(data[0])))
+    server.register("test", "sleep", _sleep)
+    await server.start()
+    return server
+
+
+def _client(server: AsyncDBServer, **kwargs) -> AsyncDBClient:
+    kwargs.setdefault("breaker_threshold", 2)
+    kwargs.setdefault("breaker_reset", 0.2)
+    return AsyncDBClient("127.0.0.1", server.port, KEY, request_timeout=2.0, **kwargs)
+
+
+async def _open_breaker(client: AsyncDBClient, server: AsyncDBServer):
+    server.inject_faults(error_rate=1.0)
+    for _ in range(client._breaker.failure_threshold):
+        with pytest.raises(DBClientError) as exc:
+            await client.call("system", "echo", [1])
+        assert exc.value.code == 503 and "circuit" not in exc.value.details
+    server.inject_faults()
+    assert client.stats()["circuit"] == "open"
+
+
+@pytest.mark.parametrize("multiplex", [False, True])
+def test_breaker_opens_half_opens_and_closes(multiplex):
+    async def scenario():
+        server = await _server()
+        client = _client(server, multiplex=multiplex)
+        try:
+            await _open_breaker(client, server)
+            with pytest.raises(DBClientError) as exc:
+                await client.call("system", "echo", [1])
+            assert exc.value.details == {"circuit": "open"}
+            assert client.counters["rejected"] == 1
+
+            await asyncio.sleep(0.25)
+            assert client.stats()["circuit"] == "half_open"
+            assert (await client.call("system", "echo", [1]))["result"] == [1]
+            assert client.stats()["circuit"] == "closed"
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def test_failed_probe_reopens_breaker():
+    async def scenario():
+        server = await _server()
+        client = _client(server)
+        try:
+            await _open_breaker(client, server)
+            await asyncio.sleep(0.25)
+            server.inject_faults(drop_rate=1.0)
+            with pytest.raises(DBClientError) as exc:
+                await client.call("system", "echo", [1])
+            assert exc.value.code == 408
+            assert client.stats()["circuit"] == "open"
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+@pytest.mark.parametrize("multiplex", [False, True])
+def test_stream_probe_closes_breaker(multiplex):
+    async def scenario():
+        server = await _server()
+        client = _client(server, streaming=True, multiplex=multiplex)
+        try:
+            await _open_breaker(client, server)
+            await asyncio.sleep(0.25)
+            items = [item async for item in client.stream("test", "items", [5], chunk_size=2)]
+            assert items == [0, 1, 2, 3, 4]
+            assert client.stats()["circuit"] == "closed"
+            for _ in range(3):
+                assert (await client.call("system", "echo", [1]))["status"] == "OK"
+            assert client.latency["request"].count == 4
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def test_abandoned_stream_probe_releases_half_open():
+    async def scenario():
+        server = await _server()
+        client = _client(server, streaming=True)
+        try:
+            await _open_breaker(client, server)
+            await asyncio.sleep(0.25)
+            stream = client.stream("test", "items", [10], chunk_size=2)
+            assert await stream.__anext__() == 0
+            await stream.aclose()
+            # Der abgebrochene Probe-Stream darf den Halboffen-Zustand nicht blockieren
+            assert (await client.call("system", "echo", [1]))["status"] == "OK"
+            assert client.stats()["circuit"] == "closed"
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def test_stream_server_error_feeds_breaker():
+    async def scenario():
+        server = await _server()
+        client = _client(server, streaming=True)
+        try:
+            server.inject_faults(error_rate=1.0)
+            for _ in range(2):
+                with pytest.raises(DBClientError) as exc:
+                    [item async for item in client.stream("test", "items", [3])]
+                assert exc.value.code == 503
+            assert client.stats()["circuit"] == "open"
+            assert client.counters["failures"] == 2
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def test_retries_only_for_idempotent_calls(monkeypatch):
+    ceilings = []
+
+    def uniform(low, high):
+        ceilings.append(high)
+        return 0.0
+
+    monkeypatch.setattr(con.random, "uniform", uniform)
+
+    async def scenario():
+        server = await _server()
+        client = _client(server, retries=3, retry_backoff=0.01, breaker_threshold=100)
+        try:
+            server.inject_faults(error_rate=1.0)
+            with pytest.raises(DBClientError):
+                await client.call("system", "echo", [1])
+            assert client.counters["requests"] == 1
+            assert client.counters["retries"] == 0
+
+            with pytest.raises(DBClientError):
+                await client.call("system", "echo", [1], idempotent=True)
+            assert client.counters["requests"] == 5
+            assert client.counters["retries"] == 3
+            assert ceilings == [0.01, 0.02, 0.04]
+
+            server.inject_faults(error_rate=0.5, seed=1)
+            results = [await client.call("system", "echo", [i], idempotent=True) for i in range(10)]
+            assert [r["result"] for r in results] == [[i] for i in range(10)]
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def test_open_breaker_fails_fast():
+    async def scenario():
+        server = await _server()
+        client = _client(server, retries=3, breaker_reset=30.0)
+        try:
+            await _open_breaker(client, server)
+            server.inject_faults(delay=1.0)
+            connections = server.connections
+            started = time.perf_counter()
+            with pytest.raises(DBClientError) as exc:
+                await client.call("system", "echo", [1], idempotent=True)
+            assert time.perf_counter() - started < 0.1
+            assert exc.value.code == 503 and exc.value.details == {"circuit": "open"}
+            assert client.counters["retries"] == 0
+            assert server.connections == connections
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+async def _stale_pool(server: AsyncDBServer, client: AsyncDBClient):
+    # Zwei Leerlauf-Verbindungen, deren Gegenstelle nach Erhalt des nächsten Befehls auflegt
+    await asyncio.gather(*(client.call("system", "echo", [i]) for i in range(2)))
+    assert len(client._idle) == 2
+    server.inject_faults(drop_rate=1.0)
+    return server.connections
+
+
+def test_stale_connection_resends_idempotent_call_once():
+    async def scenario():
+        server = await _server()
+        client = _client(server, breaker_threshold=100)
+        try:
+            connections = await _stale_pool(server, client)
+            with pytest.raises(DBClientError) as exc:
+                await client.call("system", "echo", [1], idempotent=True)
+            assert exc.value.code == 408
+            # Genau ein erneuter Versuch auf einer frischen Verbindung, die übrigen alten werden verworfen
+            assert server.connections == connections + 1
+            assert not client._idle
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def test_stale_connection_does_not_resend_non_idempotent_call():
+    async def scenario():
+        server = await _server()
+        client = _client(server, breaker_threshold=100)
+        try:
+            connections = await _stale_pool(server, client)
+            with pytest.raises(DBClientError) as exc:
+                await client.call("system", "echo", [1])
+            assert exc.value.code == 408
+            assert server.connections == connections
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def test_close_fails_queued_batch_calls():
+    async def scenario():
+        server = await _server()
+        client = _client(server, auto_batch=True, batch_window=10.0)
+        try:
+            pending = asyncio.create_task(client.call("system", "echo", [1]))
+            await asyncio.sleep(0)
+            await client.close()
+            with pytest.raises(DBClientError) as exc:
+                await pending
+            assert exc.value.code == 503
+            assert not client._batch_tasks
+        finally:
+            await server.stop()
+
+    run(scenario())
+
+
+def test_close_waits_for_batches_in_flight():
+    async def scenario():
+        server = await _server()
+        client = _client(server, auto_batch=True, batch_window=0.001)
+        try:
+            server.inject_faults(delay=0.2)
+            pending = asyncio.create_task(client.call("system", "echo", [1]))
+            await asyncio.sleep(0.05)
+            assert client._batch_tasks
+            await client.close()
+            assert not client._batch_tasks
+            assert (await pending)["result"] == [1]
+        finally:
+            await server.stop()
+
+    run(scenario())
+
+
+def test_multiplex_routes_out_of_order_replies_by_rid():
+    async def scenario():
+        server = await _server()
+        client = _client(server, multiplex=True)
+        finished = []
+
+        async def call(delay, value):
+            response = await client.call("test", "sleep", [delay, value])
+            finished.append(value)
+            return response["result"]
+
+        try:
+            results = await asyncio.gather(call(0.3, "a"), call(0.1, "b"), call(0.2, "c"))
+            assert results == ["a", "b", "c"]
+            assert finished == ["b", "c", "a"]
+            assert server.connections == 1
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def test_multiplex_timeout_leaves_other_requests_working():
+    async def scenario():
+        server = await _server()
+        client = _client(server, multiplex=True, breaker_threshold=100)
+        try:
+            slow = asyncio.create_task(client.call("test", "sleep", [0.5, "slow"], timeout=0.1))
+            other = asyncio.create_task(client.call("test", "sleep", [0.3, "other"]))
+            with pytest.raises(DBClientError) as exc:
+                await slow
+            assert exc.value.code == 504
+            assert (await other)["result"] == "other"
+            # Die verspätete Antwort auf die abgelaufene rid wird verworfen
+            await asyncio.sleep(0.3)
+            assert client._mux.alive and not client._mux.pending
+            assert (await client.call("system", "echo", [1]))["result"] == [1]
+            assert server.connections == 1
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def test_multiplex_cancelled_call_keeps_reader_alive():
+    async def scenario():
+        server = await _server()
+        client = _client(server, multiplex=True)
+        try:
+            cancelled = asyncio.create_task(client.call("test", "sleep", [0.2, "x"]))
+            other = asyncio.create_task(client.call("test", "sleep", [0.3, "y"]))
+            await asyncio.sleep(0.05)
+            cancelled.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await cancelled
+            assert (await other)["result"] == "y"
+            assert not client._mux.reader_task.done()
+            assert (await client.call("system", "echo", [2]))["result"] == [2]
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def test_multiplex_throughput_scales_with_concurrency():
+    async def scenario():
+        server = await _server()
+        client = _client(server, multiplex=True)
+        calls, latency = 20, 0.1
+        try:
+            await client.call("system", "echo", [0])
+            started = time.perf_counter()
+            results = await asyncio.gather(*(client.call("test", "sleep", [latency, i]) for i in range(calls)))
+            elapsed = time.perf_counter() - started
+            assert [r["result"] for r in results] == list(range(calls))
+            # Seriell wären es calls * latency = 2s, gemultiplext kaum mehr als eine Latenz
+            assert elapsed < calls * latency / 4
+            assert server.connections == 1
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def _record_frames(server: AsyncDBServer) -> list:
+    frames = []
+    respond = server._respond
+
+    async def recording(writer, features, command):
+        frames.append(command)
+        return await respond(writer, features, command)
+
+    server._respond = recording
+    return frames
+
+
+def test_call_many_keeps_order_and_isolates_item_errors():
+    async def scenario():
+        server = await _server()
+        client = _client(server)
+        try:
+            results = await client.call_many([
+                ("test", "sleep", [0.2, "first"]),
+                ("test", "fehlt", []),
+                ("test", "sleep", [0.0, "third"]),
+            ])
+            assert results[0]["result"] == "first"
+            assert isinstance(results[1], DBClientError)
+            assert results[1].code == 404 and results[1].details["index"] == 1
+            assert results[2]["result"] == "third"
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def test_auto_batch_merges_calls_within_window():
+    async def scenario():
+        server = await _server()
+        frames = _record_frames(server)
+        client = _client(server, auto_batch=True, batch_window=0.05)
+        try:
+            results = await asyncio.gather(
+                client.call("system", "echo", [1]),
+                client.call("test", "fehlt", []),
+                client.call("system", "echo", [3]),
+            )
+            assert [frame["action"] for frame in frames] == ["call_many"]
+            assert len(frames[0]["calls"]) == 3
+            assert results[0]["result"] == [1] and results[2]["result"] == [3]
+            assert results[1]["status"] == "ERROR" and results[1]["code"] == 404
+
+            # Ein Aufruf nach Ablauf des Fensters landet in einem eigenen Frame
+            await client.call("system", "echo", [4])
+            assert [frame["action"] for frame in frames] == ["call_many", "call"]
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def _record_flags(client: AsyncDBClient) -> list:
+    # Flag-Byte jedes gesendeten Frames: b"\x00" = roh, b"\x01" = zlib
+    flags = []
+    connect = client._connect
+
+    async def recording_connect():
+        conn = await connect()
+        write = conn.writer.write
+
+        def recording_write(data):
+            flags.append(client.aesgcm.decrypt(client.nonce, data[4:], None)[:1])
+            write(data)
+
+        conn.writer.write = recording_write
+        return conn
+
+    client._connect = recording_connect
+    return flags
+
+
+def test_compression_requires_both_sides():
+    async def scenario():
+        server = await _server()
+        clients = [_client(server, compression=True), _client(server)]
+        try:
+            conn = await clients[0]._connect()
+            assert conn.features == {"zlib"}
+            await conn.close()
+            conn = await clients[1]._connect()
+            assert conn.features == set()
+            await conn.close()
+
+            server.SUPPORTED_FEATURES = ("stream",)
+            conn = await clients[0]._connect()
+            assert conn.features == set()
+            await conn.close()
+        finally:
+            for client in clients:
+                await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def test_only_payloads_above_threshold_are_compressed():
+    async def scenario():
+        server = await _server()
+        client = _client(server, compression=True, compress_threshold=256)
+        flags = _record_flags(client)
+        try:
+            assert (await client.call("system", "echo", ["a"]))["result"] == ["a"]
+            assert (await client.call("system", "echo", ["a" * 1000]))["result"] == ["a" * 1000]
+            assert flags == [b"\x00", b"\x01"]
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+def test_oversized_decompressed_frame_is_rejected():
+    async def scenario():
+        server = await _server()
+        client = _client(server, compression=True, max_frame_size=1000)
+        try:
+            with pytest.raises(DBClientError) as exc:
+                await client.call("system", "echo", ["a" * 5000])
+            assert exc.value.code == 413
+            assert client.stats()["pool"]["size"] == 0
+            assert (await client.call("system", "echo", ["a"]))["result"] == ["a"]
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
+
+
+@pytest.mark.parametrize("multiplex", [False, True])
+def test_stream_yields_chunk_by_chunk(multiplex):
+    async def scenario():
+        server = await _server()
+        client = _client(server, streaming=True, multiplex=multiplex)
+        frames = []
+        read_frame = client._read_frame
+
+        async def recording_read_frame(conn):
+            frame = await read_frame(conn)
+            frames.append(frame)
+            return frame
+
+        client._read_frame = recording_read_frame
+        try:
+            seen = []
+            async for item in client.stream("test", "items", [5], chunk_size=2):
+                seen.append((item, len([f for f in frames if "chunk" in f])))
+            assert [item for item, _ in seen] == [0, 1, 2, 3, 4]
+            if not multiplex:
+                # Beim ersten Element ist erst der erste Block gelesen, nicht die ganze Antwort;
+                # der Mux-Reader liest dagegen unabhängig vom Verbraucher voraus
+                assert [read for _, read in seen] == [1, 1, 2, 2, 3]
+            chunks = [f["chunk"] for f in frames if "chunk" in f]
+            assert chunks == [[0, 1], [2, 3], [4]]
+            assert frames[-1].get("end") is True
+        finally:
+            await client.close()
+            await server.stop()
+
+    run(scenario())
@@ -0,0 +1,22 @@
+from moduals.ini_crud import INIManager
+from moduals.config_crud import BotConfig
+
+
+def test_reload_applies_live_values_and_reports_restart_keys(tmp_path):
+    path = tmp_path / "variables.ini"
+    path.write_text("[VARS]\nBackUpsFile=5\nMetricsPort=9108\n", encoding="utf-8")
+    config = BotConfig(INIManager(str(path)))
+    applied = []
+    config.on_reload(lambda: applied.append(config.backups_keep))
+    assert config.restart_pending() == []
+
+    config.set_many({"VARS": {"BackUpsFile": "3"}})
+    assert applied == [3]
+    assert config.restart_pending() == []
+
+    config.set_many({"VARS": {"MetricsPort": "19200"}, "FILES": {"PersoBackend": "sqlite"}})
+    assert config.metrics_port == 19200
+    assert config.restart_pending() == ["VARS.MetricsPort", "FILES.PersoBackend"]
+
+    config.set_many({"VARS": {"MetricsPort": "9108"}})
+    assert config.restart_pending() == ["FILES.PersoBackend"]
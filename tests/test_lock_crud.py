@@ -0,0 +1,57 @@
+import math
+import time
+import asyncio
+import orjson
+import pytest
+from moduals.lock_crud import LockManager
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_expired_locks_are_purged(tmp_path):
+    manager = LockManager(tmp_path / "locks.json")
+    manager.add_lock("1", 0.05)
+    manager.add_lock("2", 60)
+    manager.add_lock("3", 0.05)
+    manager.remove_lock("3")
+    time.sleep(0.1)
+
+    assert manager.remaining("1") is None
+    assert [user_id for user_id, _ in manager.list_locks()] == ["2"]
+    assert manager.purge_expired() == 1
+    assert set(manager.locks) == {"2"}
+    assert manager.purge_expired() == 0
+
+
+def test_sweeper_persists_purged_locks(tmp_path):
+    async def scenario():
+        path = tmp_path / "locks.json"
+        manager = LockManager(path, save_delay=0.01)
+        await manager.start()
+        try:
+            manager.add_lock("1", 0.05)
+            manager.add_lock("2", 60)
+            await asyncio.sleep(0.3)
+            assert set(orjson.loads(path.read_bytes())) == {"2"}
+        finally:
+            await manager.stop()
+
+    run(scenario())
+
+
+@pytest.mark.parametrize("seconds", [math.nan, math.inf, -math.inf])
+def test_non_finite_duration_is_rejected(tmp_path, seconds):
+    manager = LockManager(tmp_path / "locks.json")
+    with pytest.raises(ValueError):
+        manager.add_lock("1", seconds)
+    assert manager.locks == {} and manager._heap == []
+
+
+def test_invalid_entries_are_skipped_on_load(tmp_path):
+    path = tmp_path / "locks.json"
+    expiry = time.time() + 60
+    path.write_bytes(orjson.dumps({"1": "nan", "2": "kaputt", "3": expiry}))
+    manager = LockManager(path)
+    assert manager.locks == {"3": expiry}
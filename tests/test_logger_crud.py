@@ -0,0 +1,41 @@
+import sys
+import queue
+import logging
+from moduals.logger_crud import LoggingManager, _DeferredQueueHandler
+
+
+def test_prepare_freezes_message_and_traceback():
+    handler = _DeferredQueueHandler(queue.SimpleQueue())
+    state = ["offen"]
+    try:
+        raise RuntimeError("kaputt")
+    except RuntimeError:
+        record = logging.getLogger("test").makeRecord(
+            "test", logging.ERROR, __file__, 1, "Antrag %s", (state,), sys.exc_info()
+        )
+    prepared = handler.prepare(record)
+    state[0] = "angenommen"
+
+    assert prepared.msg == "Antrag ['offen']" and prepared.args is None
+    assert prepared.exc_info is None and "RuntimeError: kaputt" in prepared.exc_text
+    formatted = logging.Formatter("%(message)s").format(prepared)
+    assert formatted.startswith("Antrag ['offen']\nTraceback")
+    # Der ursprüngliche Record bleibt für andere Handler unverändert
+    assert record.args == (state,) and record.exc_info is not None
+
+
+def test_log_directory_is_created(tmp_path):
+    logger = logging.getLogger("SystemLogger")
+    saved = logger.handlers[:]
+    logger.handlers.clear()
+    log_file = tmp_path / "app_data" / "log" / "bot.log"
+    manager = LoggingManager(str(log_file))
+    try:
+        manager.get_logger().info("Start")
+        manager.stop()
+        assert "Start" in log_file.read_text(encoding="utf-8")
+    finally:
+        manager.stop()
+        for handler in logger.handlers:
+            handler.close()
+        logger.handlers[:] = saved
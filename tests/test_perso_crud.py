@@ -0,0 +1,68 @@
+import pytest
+from moduals.perso_crud import Person, PersonenDB
+
+
+def _person(name: str = "Max Mustermann") -> Person:
+    return Person(
+        vollstaendiger_name=name,
+        geburtsdatum="01.01.2000",
+        geburtsort_nationalitaet="Hamburg / deutsch",
+        groesse="180",
+        geschlecht="m",
+        status="offen",
+    )
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_uuid_lookup_follows_update_and_delete(tmp_path, backend):
+    db = PersonenDB(tmp_path, backend=backend)
+    try:
+        first = db.add_perso("1", _person())
+        second = db.add_perso("2", _person("Erika Musterfrau"))
+        assert db.get_perso_by_uuid(first)["vollstaendiger_name"] == "Max Mustermann"
+        assert db.get_discordid_by_uuid(second) == "2"
+
+        assert db.update_perso_by_uuid(first, {"status": "angenommen"})
+        assert db.get_perso_by_uuid(first)["status"] == "angenommen"
+        assert db.get_persos_by_discordid("1")[0]["status"] == "angenommen"
+
+        # Falscher Besitzer: der Datensatz bleibt unverändert
+        assert not db.delete_perso("1", second)
+        assert db.get_perso_by_uuid(second) is not None
+
+        assert db.delete_perso_by_uuid(first)
+        assert db.get_perso_by_uuid(first) is None
+        assert db.get_discordid_by_uuid(first) is None
+        assert not db.update_perso_by_uuid(first, {"status": "abgelehnt"})
+        assert db.count_persos("1") == 0
+        assert db.get_perso_by_uuid(second)["vollstaendiger_name"] == "Erika Musterfrau"
+    finally:
+        db.close()
+
+
+def test_json_is_migrated_to_sqlite_once(tmp_path):
+    db = PersonenDB(tmp_path, backend="json")
+    try:
+        uuids = [db.add_perso("1", _person(f"Person {i}")) for i in range(3)]
+        uuids.append(db.add_perso("2", _person("Erika Musterfrau")))
+    finally:
+        db.close()
+
+    db = PersonenDB(tmp_path, backend="sqlite")
+    try:
+        assert (tmp_path / "personen.db").exists()
+        assert db.count_persos("1") == 3
+        assert [p["uuid"] for p in db.get_persos_by_discordid("1")] == uuids[:3]
+        assert db.get_discordid_by_uuid(uuids[3]) == "2"
+        db.delete_perso_by_uuid(uuids[0])
+    finally:
+        db.close()
+
+    # Beim erneuten Öffnen wird nicht noch einmal aus personen.json migriert
+    db = PersonenDB(tmp_path, backend="sqlite")
+    try:
+        assert db.get_perso_by_uuid(uuids[0]) is None
+        assert db.count_persos("1") == 2
+        assert db.get_perso_by_uuid(uuids[3])["vollstaendiger_name"] == "Erika Musterfrau"
+    finally:
+        db.close()
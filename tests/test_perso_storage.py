@@ -0,0 +1,129 @@
+import time
+import orjson
+from moduals import perso_storage
+from moduals.perso_storage import JsonFileBackend
+
+
+def _record(uuid_str: str, name: str = "Max") -> dict:
+    return {"uuid": uuid_str, "name": name}
+
+
+def test_journal_replay_drops_torn_trailing_record(tmp_path):
+    path = tmp_path / "personen.json"
+    backend = JsonFileBackend(path, journal=True)
+    backend.add("1", _record("a"))
+    backend.update("1", "a", {"name": "Erika"})
+    backend.close()
+    valid_size = backend.journal_path.stat().st_size
+    # Absturz mitten im Schreiben: der letzte Eintrag hat kein Zeilenende
+    with open(backend.journal_path, "ab") as f:
+        f.write(b'{"op":"add","id":"1","rec":{"uuid":"b"')
+
+    backend = JsonFileBackend(path, journal=True)
+    try:
+        assert backend.get_by_discordid("1") == [_record("a", "Erika")]
+        assert backend.get_by_uuid("b") is None
+        assert backend.journal_path.stat().st_size == valid_size
+        backend.add("1", _record("c"))
+    finally:
+        backend.close()
+
+    backend = JsonFileBackend(path, journal=True)
+    try:
+        assert [p["uuid"] for p in backend.get_by_discordid("1")] == ["a", "c"]
+    finally:
+        backend.close()
+
+
+def test_compaction_persists_data_and_removes_journal(tmp_path):
+    path = tmp_path / "personen.json"
+    backend = JsonFileBackend(path, journal=True)
+    try:
+        for i in range(5):
+            backend.add("1", _record(str(i)))
+        backend.delete("1", "0")
+        assert orjson.loads(path.read_bytes()) == {}
+
+        assert backend.compact()
+        assert [p["uuid"] for p in orjson.loads(path.read_bytes())["1"]] == ["1", "2", "3", "4"]
+        assert backend.journal_path.stat().st_size == 0
+        assert not backend._old_journal_path.exists()
+    finally:
+        backend.close()
+
+    backend = JsonFileBackend(path, journal=True)
+    try:
+        assert [p["uuid"] for p in backend.get_by_discordid("1")] == ["1", "2", "3", "4"]
+    finally:
+        backend.close()
+
+
+def test_restore_writes_file_before_clearing_journal(tmp_path):
+    path = tmp_path / "personen.json"
+    backend = JsonFileBackend(path, journal=True)
+    try:
+        backend.add("1", _record("a"))
+        snapshot = backend.snapshot()
+        backend.add("2", _record("b"))
+
+        assert backend.restore(snapshot)
+        assert orjson.loads(path.read_bytes()) == {"1": [_record("a")]}
+        assert backend.journal_path.stat().st_size == 0
+        assert backend.get_by_uuid("b") is None
+    finally:
+        backend.close()
+
+    backend = JsonFileBackend(path, journal=True)
+    try:
+        assert backend.get_by_discordid("1") == [_record("a")]
+        assert backend.get_by_uuid("b") is None
+    finally:
+        backend.close()
+
+
+def _count_writes(monkeypatch) -> list:
+    writes = []
+    atomic_write = perso_storage.atomic_write
+
+    def counting_write(path, payload):
+        writes.append(orjson.loads(payload))
+        atomic_write(path, payload)
+
+    monkeypatch.setattr(perso_storage, "atomic_write", counting_write)
+    return writes
+
+
+def test_write_behind_burst_is_flushed_once(tmp_path, monkeypatch):
+    path = tmp_path / "personen.json"
+    backend = JsonFileBackend(path, write_behind=True, flush_interval=60.0)
+    writes = _count_writes(monkeypatch)
+    try:
+        for i in range(20):
+            backend.add("1", _record(str(i)))
+        backend.update("1", "0", {"name": "Erika"})
+        assert writes == []
+
+        assert backend.flush()
+        assert backend.flush()
+        assert len(writes) == 1 and len(writes[0]["1"]) == 20
+        assert orjson.loads(path.read_bytes()) == writes[0]
+    finally:
+        backend.close()
+    assert len(writes) == 1
+
+
+def test_write_behind_timer_writes_burst_once(tmp_path, monkeypatch):
+    path = tmp_path / "personen.json"
+    backend = JsonFileBackend(path, write_behind=True, flush_interval=0.05)
+    writes = _count_writes(monkeypatch)
+    try:
+        for i in range(20):
+            backend.add("1", _record(str(i)))
+        deadline = time.monotonic() + 2.0
+        while not writes and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        assert len(writes) == 1 and len(writes[0]["1"]) == 20
+    finally:
+        backend.close()
+    assert len(writes) == 1
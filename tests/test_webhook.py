@@ -0,0 +1,124 @@
+import socket
+import asyncio
+import orjson
+from aiohttp import web
+from moduals.webhook_crud import WebhookLogShipper
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def _webhook(responses: list) -> tuple:
+    # Antwortet der Reihe nach mit den vorgegebenen (Status, JSON)-Paaren, danach mit 204
+    received = []
+
+    async def handle(request):
+        received.append((await request.json())["content"])
+        status, body = responses.pop(0) if responses else (204, None)
+        if body is None:
+            return web.Response(status=status)
+        return web.json_response(body, status=status)
+
+    app = web.Application()
+    app.router.add_post("/hook", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/hook", received
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_for(condition, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_pack_respects_discord_limit(tmp_path):
+    shipper = WebhookLogShipper("http://127.0.0.1/hook", tmp_path / "buffer.jsonl")
+    lines = [str(i) * (i % 7 * 150 + 1) for i in range(40)] + ["x" * 4500]
+    for line in lines:
+        shipper.submit(line)
+
+    batches = []
+    while shipper._lines:
+        batches.append(shipper._pack())
+    assert all(len("\n".join(batch)) <= 2000 for batch in batches)
+    assert [line for batch in batches for line in batch][:40] == lines[:40]
+    assert "".join(line for batch in batches for line in batch)[-4500:] == "x" * 4500
+
+
+def test_rate_limited_batch_is_resent_after_retry_after(tmp_path):
+    async def scenario():
+        runner, url, received = await _webhook([(429, {"retry_after": 0.05})])
+        shipper = WebhookLogShipper(url, tmp_path / "buffer.jsonl", batch_delay=0.01)
+        try:
+            await shipper.start()
+            shipper.submit("eins")
+            shipper.submit("zwei")
+            await _wait_for(lambda: len(received) == 2)
+            assert received == ["eins\nzwei", "eins\nzwei"]
+            assert not shipper._lines and not (tmp_path / "buffer.jsonl").exists()
+        finally:
+            await shipper.stop()
+            await runner.cleanup()
+
+    run(scenario())
+
+
+def test_unreachable_webhook_spills_and_requeues_in_order(tmp_path):
+    async def scenario():
+        buffer_path = tmp_path / "buffer.jsonl"
+        shipper = WebhookLogShipper(f"http://127.0.0.1:{_free_port()}/hook", buffer_path, batch_delay=0.01)
+        await shipper.start()
+        for line in ("eins", "zwei", "drei"):
+            shipper.submit(line)
+        await _wait_for(buffer_path.exists)
+        await shipper.stop(timeout=0.5)
+        assert [orjson.loads(raw) for raw in buffer_path.read_bytes().splitlines()] == ["eins", "zwei", "drei"]
+
+        runner, url, received = await _webhook([])
+        shipper = WebhookLogShipper(url, buffer_path, batch_delay=0.01)
+        try:
+            await shipper.start()
+            await _wait_for(lambda: received)
+            assert received == ["eins\nzwei\ndrei"]
+            assert not buffer_path.exists()
+        finally:
+            await shipper.stop()
+            await runner.cleanup()
+
+    run(scenario())
+
+
+def test_unexpected_error_keeps_shipper_running(tmp_path):
+    async def scenario():
+        buffer_path = tmp_path / "buffer.jsonl"
+        shipper = WebhookLogShipper("http://127.0.0.1/hook", buffer_path, batch_delay=0.01)
+
+        async def broken_post(content):
+            raise RuntimeError("kaputt")
+
+        shipper._post = broken_post
+        await shipper.start()
+        try:
+            shipper.submit("eins")
+            await _wait_for(buffer_path.exists)
+            assert not shipper._task.done()
+            assert [orjson.loads(raw) for raw in buffer_path.read_bytes().splitlines()] == ["eins"]
+        finally:
+            shipper._task.cancel()
+            await asyncio.gather(shipper._task, return_exceptions=True)
+            shipper._task = None
+            await shipper._session.close()
+
+    run(scenario())